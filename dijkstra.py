@@ -131,11 +131,11 @@ class Heap:
             left_child and node.key > left_child.key or
             right_child and node.key > right_child.key
         ):
-            if not right_child or left_child.key < right_child.key:
+            if not right_child or left_child.key <= right_child.key:
                 self.nodes[left_idx] = node
                 self.nodes[idx] = left_child
                 self.bubble_down(node, left_idx)
-            elif not left_child or right_child.key < left_child.key:
+            else:
                 self.nodes[right_idx] = node
                 self.nodes[idx] = right_child
                 self.bubble_down(node, right_idx)
@@ -19,6 +19,13 @@
 # forum!
 
 
+import sys
+from array import array
+from fractions import Fraction
+from itertools import repeat
+from operator import add
+
+
 class Item:
 
     def __init__(self, value=0, weight=0):
@@ -57,7 +64,133 @@ def knapsack(items, capacity):
     return memo[capacity][len(items)]
 
 
-def main():
+def knapsack_row(items, capacity):
+    # roll a single row of the 2D array forward one item at a time:
+    # after each item, row[c] is the optimal value using the items
+    # seen so far and usable capacity c, so memory is O(capacity). Every
+    # cell still becomes a Python int for every item, so this suits
+    # capacities like knapsack1.txt's, not knapsack_big.txt's
+    row = array('q', [0]) * (capacity + 1)
+    for item in items:
+        # if the item's weight exceeds the capacity, it is always excluded
+        if item.weight > capacity:
+            continue
+        # the better of excluding the item (row[c]) and including it
+        # (row[c - weight] + value) for every c >= weight at once; the
+        # right-hand side is built before the row is overwritten, so it
+        # only sees the previous row and each item is used at most once
+        row[item.weight:] = array('q', map(
+            max,
+            row[item.weight:],
+            map(add, row[:capacity + 1 - item.weight], repeat(item.value)),
+        ))
+    return row
+
+
+def knapsack_rolling(items, capacity):
+    return knapsack_row(items, capacity)[capacity]
+
+
+def knapsack_items(items, capacity):
+    # recover the indices of an optimal set of items without the 2D array:
+    # split the items in half, compute the row of each half, and find the
+    # capacity c at which the first half's optimum for c plus the second
+    # half's optimum for capacity - c is the best; then solve each half
+    # with its share of the capacity. Memory stays O(capacity) and the
+    # rows shrink by half at every level, so this takes about twice as
+    # long as computing the optimal value alone
+    chosen = []
+    # (first item index, last item index + 1, usable capacity)
+    stack = [(0, len(items), capacity)]
+    while stack:
+        lo, hi, c = stack.pop()
+        if hi - lo == 1:
+            if items[lo].weight <= c and items[lo].value > 0:
+                chosen.append(lo)
+            continue
+        if hi - lo == 0:
+            continue
+        mid = (lo + hi) // 2
+        forward = knapsack_row(items[lo:mid], c)
+        backward = knapsack_row(items[mid:hi], c)
+        # totals[k] is the best value with capacity k for the first half
+        # and capacity c - k for the second half
+        totals = list(map(add, forward, reversed(backward)))
+        split = totals.index(max(totals))
+        stack.append((lo, mid, split))
+        stack.append((mid, hi, c - split))
+    return sorted(chosen)
+
+
+def knapsack_batch(items, capacities):
+    # the row for the largest capacity holds the optimal value
+    # for every smaller capacity too, so one pass answers them all
+    row = knapsack_row(items, max(capacities))
+    return [row[c] for c in capacities]
+
+
+def knapsack_fptas(items, capacity, epsilon=0.1):
+    # only the items that fit on their own can be part of a solution
+    items = [
+        item for item in items
+        if item.weight <= capacity and item.value > 0
+    ]
+    if not items:
+        return 0
+
+    # the better of the most valuable item and the greedy prefix of the
+    # items by decreasing value density is at least half of the optimum
+    lower = max(item.value for item in items)
+    greedy_weight = 0
+    greedy_value = 0
+    for item in sorted(items, reverse=True, key=lambda i: (
+            i.weight == 0, Fraction(i.value, i.weight or 1))):
+        if greedy_weight + item.weight > capacity:
+            break
+        greedy_weight += item.weight
+        greedy_value += item.value
+    lower = max(lower, greedy_value)
+
+    # round the values down to multiples of epsilon * lower / n, which
+    # loses at most epsilon * lower <= epsilon * optimum in total; no
+    # solution is worth more than 2 * lower, i.e. 2n / epsilon scaled
+    # units, so the row size depends on n and epsilon but not on capacity
+    num_items = len(items)
+    profits = [
+        int(item.value * num_items / (epsilon * lower))
+        for item in items
+    ]
+    bound = int(2 * num_items / epsilon) + 1
+
+    # row[p] is the lightest set of items worth p scaled units, encoded as
+    # weight * big - value so that min() prefers the lighter set and then
+    # the more valuable one; sets heavier than the capacity are useless
+    big = sum(item.value for item in items) + 1
+    row = [0] + [(capacity + 1) * big] * bound
+    for item, profit in zip(items, profits):
+        row[profit:] = list(map(
+            min,
+            row[profit:],
+            map(add, row[:bound + 1 - profit],
+                repeat(item.weight * big - item.value)),
+        ))
+
+    best = 0
+    for key in row:
+        weight = -(-key // big)
+        if weight <= capacity:
+            best = max(best, weight * big - key)
+    return best
+
+
+ENGINES = {
+    'fptas': knapsack_fptas,
+    'table': knapsack,
+    'rolling': knapsack_rolling,
+}
+
+
+def main(engine='table'):
     with open('knapsack1.txt', 'r') as f:
         capacity, num_items = [int(n) for n in next(f).split()]
         items = []
@@ -65,9 +198,9 @@ def main():
             value, weight = line.split()
             items.append(Item(value=int(value),
                               weight=int(weight)))
-        max_value = knapsack(items, capacity)
+        max_value = ENGINES[engine](items, capacity)
         print('The value of the optimal solution is {}'.format(max_value))
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
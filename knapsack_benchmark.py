@@ -0,0 +1,89 @@
+# Compare the batch capacity queries and the FPTAS approximation engine of
+# knapsack.py and knapsack_large.py with the exact engines, on knapsack1.txt
+# and knapsack_big.txt.
+#
+# The batch benchmark asks for the optimal value at several capacities, once
+# with a separate exact run per capacity and once with a single batch pass.
+# The FPTAS benchmark reports the running time and the fraction of the optimal
+# value that is reached for each epsilon. Run it with the epsilons as
+# arguments, for example "python knapsack_benchmark.py 0.5 0.1 0.01".
+
+
+import sys
+import time
+
+import knapsack
+import knapsack_large
+
+
+NUM_CAPACITIES = 10
+EPSILONS = [0.5, 0.1]
+# the exact engine and the batch engine of the module for each file
+INSTANCES = [
+    ('knapsack1.txt', knapsack.knapsack_rolling, knapsack.knapsack_batch),
+    ('knapsack_big.txt', knapsack_large.knapsack,
+     knapsack_large.knapsack_batch),
+]
+
+
+def read_items(filename):
+    with open(filename, 'r') as f:
+        capacity, num_items = [int(n) for n in next(f).split()]
+        items = []
+        for line in f:
+            value, weight = line.split()
+            items.append(knapsack.Item(value=int(value),
+                                       weight=int(weight)))
+    return items, capacity
+
+
+def timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return result, time.time() - start
+
+
+def benchmark_batch(items, capacity, exact, batch):
+    # evenly spaced capacities up to the capacity of the instance
+    capacities = [
+        capacity * (i + 1) // NUM_CAPACITIES
+        for i in range(NUM_CAPACITIES)
+    ]
+    separate_time = 0
+    expected = []
+    for c in capacities:
+        value, elapsed = timed(exact, items, c)
+        expected.append(value)
+        separate_time += elapsed
+    values, batch_time = timed(batch, items, capacities)
+    print('  {} capacities: {:8.2f}s separately, {:8.2f}s in one pass, '
+          '{}'.format(NUM_CAPACITIES, separate_time, batch_time,
+                      'same values' if values == expected else 'MISMATCH'))
+
+
+def benchmark_fptas(items, capacity, exact, epsilons):
+    optimum, exact_time = timed(exact, items, capacity)
+    print('  exact:        value={:<10} time={:8.2f}s'.format(
+        optimum, exact_time))
+    for epsilon in epsilons:
+        value, elapsed = timed(knapsack.knapsack_fptas, items, capacity,
+                               epsilon)
+        print('  fptas eps={:<4} value={:<10} time={:8.2f}s '
+              'ratio={:.5f}'.format(epsilon, value, elapsed,
+                                    float(value) / optimum))
+
+
+def main(epsilons=EPSILONS):
+    for filename, exact, batch in INSTANCES:
+        items, capacity = read_items(filename)
+        print('{} ({} items, capacity {})'.format(
+            filename, len(items), capacity))
+        benchmark_batch(items, capacity, exact, batch)
+        benchmark_fptas(items, capacity, exact, epsilons)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([float(arg) for arg in sys.argv[1:]])
+    else:
+        main()
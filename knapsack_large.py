@@ -25,11 +25,18 @@
 # forum!
 
 
+import heapq
 import sys
-sys.setrecursionlimit(20000)
+import time
+from bisect import bisect_right
+from fractions import Fraction
+from itertools import count
+from knapsack import knapsack_fptas
 
 
-MEMO = {}
+# above this many (item, capacity) cells, the DP engines are considered
+# too expensive and the auto engine switches to branch and bound
+DP_CELL_LIMIT = 10 ** 10
 
 
 class Item:
@@ -39,39 +46,194 @@ class Item:
         self.weight = weight
 
 
-def knapsack(items, idx, capacity):
-    # cache only the item idx and capacity for space efficiency
-    if (idx, capacity) not in MEMO:
-        # base case: if there are no items, the max value is 0
-        if idx == 0:
-            MEMO[(idx, capacity)] = 0
-        else:
-            item = items[idx]
-            # if the item's weight exceeds the usable capacity,
-            # we're forced to exclude it
-            if item.weight > capacity:
-                MEMO[(idx, capacity)] = knapsack(items, idx - 1, capacity)
-            # otherwise, we may be able to select the item;
-            # choose the better of the 2 possibilities
-            else:
-                MEMO[(idx, capacity)] = max(
-                    knapsack(items, idx - 1, capacity),
-                    knapsack(items, idx - 1, capacity - item.weight) + item.value,
-                )
-    return MEMO[(idx, capacity)]
-
-
-def main():
+def knapsack_frontier(items, capacity):
+    # instead of caching every (idx, capacity) subproblem, keep only the
+    # capacities at which the optimal value of the items seen so far steps
+    # up: a list of (weight, value) breakpoints sorted by weight, with
+    # strictly increasing values, where the optimal value for capacity c
+    # is the value of the last breakpoint with weight <= c
+    frontier = [(0, 0)]
+    for item in items:
+        # if the item's weight exceeds the capacity, it is always excluded
+        if item.weight > capacity:
+            continue
+        # the breakpoints of the solutions that include the item
+        shifted = [
+            (weight + item.weight, value + item.value)
+            for weight, value in frontier
+            if weight + item.weight <= capacity
+        ]
+        # merge the 2 step functions, both already sorted by weight,
+        # and drop every state that weighs more but is worth no more
+        merged = []
+        best = -1
+        for weight, value in sorted(frontier + shifted):
+            if value > best:
+                # a heavier state at the same weight dominates the lighter one
+                if merged and merged[-1][0] == weight:
+                    merged[-1] = (weight, value)
+                else:
+                    merged.append((weight, value))
+                best = value
+        frontier = merged
+    return frontier
+
+
+def knapsack(items, capacity):
+    # the last breakpoint is the best value within the capacity
+    return knapsack_frontier(items, capacity)[-1][1]
+
+
+def knapsack_batch(items, capacities):
+    # the frontier for the largest capacity is the optimal value
+    # step function for every smaller capacity too
+    frontier = knapsack_frontier(items, max(capacities))
+    weights = [weight for weight, value in frontier]
+    return [
+        frontier[bisect_right(weights, c) - 1][1]
+        for c in capacities
+    ]
+
+
+def knapsack_items(items, capacity):
+    # recover the indices of an optimal set of items with the same divide
+    # and conquer as knapsack.knapsack_items, but with frontiers instead of
+    # rows: split the items in half, compute the frontier of each half, and
+    # pair up the breakpoints of the 2 halves whose weights fit together
+    chosen = []
+    # (first item index, last item index + 1, usable capacity)
+    stack = [(0, len(items), capacity)]
+    while stack:
+        lo, hi, c = stack.pop()
+        if hi - lo == 1:
+            if items[lo].weight <= c and items[lo].value > 0:
+                chosen.append(lo)
+            continue
+        if hi - lo == 0:
+            continue
+        mid = (lo + hi) // 2
+        forward = knapsack_frontier(items[lo:mid], c)
+        backward = knapsack_frontier(items[mid:hi], c)
+        # walk the first frontier up in weight and the second one down,
+        # so each breakpoint is paired with the heaviest one that still fits
+        best = -1
+        b = len(backward) - 1
+        for weight, value in forward:
+            while backward[b][0] > c - weight:
+                b -= 1
+            if value + backward[b][1] > best:
+                best = value + backward[b][1]
+                split = weight
+        stack.append((lo, mid, split))
+        stack.append((mid, hi, c - split))
+    return sorted(chosen)
+
+
+def branch_and_bound(items, capacity, time_budget=None):
+    # sort the items by decreasing value density (items that weigh nothing
+    # first), comparing exact fractions, so that the greedy fractional
+    # relaxation of any subproblem is a prefix of the items that are left
+    order = sorted(
+        range(len(items)),
+        key=lambda i: (items[i].weight > 0, -Fraction(
+            items[i].value, items[i].weight or 1)),
+    )
+    weights = [items[i].weight for i in order]
+    values = [items[i].value for i in order]
+    # prefix sums of the sorted weights and values
+    prefix_weights = [0]
+    prefix_values = [0]
+    for weight, value in zip(weights, values):
+        prefix_weights.append(prefix_weights[-1] + weight)
+        prefix_values.append(prefix_values[-1] + value)
+
+    def bound(idx, c, value):
+        # take the next items whole while they fit, then the fraction
+        # of the first one that doesn't; no solution can do better
+        last = bisect_right(prefix_weights, prefix_weights[idx] + c) - 1
+        value += prefix_values[last] - prefix_values[idx]
+        if last < len(weights):
+            c -= prefix_weights[last] - prefix_weights[idx]
+            value += c * values[last] // weights[last]
+        return value
+
+    deadline = None if time_budget is None else time.time() + time_budget
+    best_value = 0
+    best_chosen = None
+    # open subproblems, best bound first: (-bound, tiebreaker, idx,
+    # capacity, value, chosen), where chosen is a linked list of
+    # (item, rest) pairs
+    tiebreaker = count()
+    heap = [(-bound(0, capacity, 0), next(tiebreaker), 0, capacity, 0, None)]
+    expanded = 0
+    timed_out = False
+    while heap and -heap[0][0] > best_value and not timed_out:
+        _, _, idx, c, value, chosen = heapq.heappop(heap)
+        # restart from the most promising subproblem and dive depth first,
+        # taking each item if it fits and leaving the other branch for later
+        while True:
+            expanded += 1
+            if value > best_value:
+                best_value = value
+                best_chosen = chosen
+            if idx == len(weights) or bound(idx, c, value) <= best_value:
+                break
+            exclude_bound = bound(idx + 1, c, value)
+            if weights[idx] <= c:
+                if exclude_bound > best_value:
+                    heapq.heappush(heap, (-exclude_bound, next(tiebreaker),
+                                          idx + 1, c, value, chosen))
+                chosen = (order[idx], chosen)
+                c -= weights[idx]
+                value += values[idx]
+            idx += 1
+            # check the deadline every so often and return the best
+            # solution found so far once it has passed
+            if (deadline is not None and expanded % 1024 == 0 and
+                    time.time() > deadline):
+                timed_out = True
+                break
+
+    indices = []
+    while best_chosen is not None:
+        idx, best_chosen = best_chosen
+        indices.append(idx)
+    # the search is exhaustive unless the deadline cut it short
+    return best_value, sorted(indices), not timed_out
+
+
+def knapsack_branch_and_bound(items, capacity, time_budget=None):
+    return branch_and_bound(items, capacity, time_budget)[0]
+
+
+def knapsack_auto(items, capacity):
+    # the DP engines do O(n * capacity) work in the worst case, whereas
+    # branch and bound depends on n and how tight the bounds are, so use
+    # it when there are few items compared to the capacity
+    if len(items) * capacity <= DP_CELL_LIMIT:
+        return knapsack(items, capacity)
+    return knapsack_branch_and_bound(items, capacity)
+
+
+ENGINES = {
+    'auto': knapsack_auto,
+    'bnb': knapsack_branch_and_bound,
+    'fptas': knapsack_fptas,
+    'frontier': knapsack,
+}
+
+
+def main(engine='auto'):
     with open('knapsack_big.txt', 'r') as f:
         capacity, num_items = [int(n) for n in next(f).split()]
-        items = [Item(value=0, weight=0)]
+        items = []
         for line in f:
             value, weight = line.split()
             items.append(Item(value=int(value),
                               weight=int(weight)))
-        max_value = knapsack(items, num_items, capacity)
+        max_value = ENGINES[engine](items, capacity)
         print('The value of the optimal solution is {}'.format(max_value))
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
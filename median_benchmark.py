@@ -0,0 +1,222 @@
+# Compare the exact two-heap median maintenance engine with the approximate
+# KLL quantile sketch in median_maintenance.py, in terms of running time, peak
+# memory and accuracy.
+#
+# The first benchmark streams Median.txt through both engines. The second one
+# streams a generated permutation of 1 ... n, like Median.txt, whose q-quantile
+# is known to be about q * n, so the accuracy of the sketch can be checked
+# without keeping the stream around. Run it with the stream length as an
+# argument, for example "python median_benchmark.py 100000000" for a stream of
+# 10^8 values. The exact engine keeps every value, so it is skipped for very
+# long streams.
+#
+# Before the benchmarks, the sliding window engine is checked against a
+# sorted copy of the window on random streams.
+#
+# The third benchmark feeds "key value" records for thousands of keys from
+# several concurrent streams into the asyncio ingestion front end, and reports
+# its throughput and the latency of applying a batch for each batch size.
+
+
+import asyncio
+import bisect
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from median_maintenance import (
+    KeyedMedians,
+    QuantileSketch,
+    WindowMedian,
+    ingest,
+    running_medians,
+)
+
+
+EXACT_LIMIT = 10 ** 6
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+NUM_CHECKS = 200
+
+
+def check_window(num_checks=NUM_CHECKS, length=500):
+    # compare the sliding window engine with the lower median of a sorted
+    # copy of the window, on random streams with many repeated values, and
+    # check that the stale entries of its heaps don't pile up
+    for seed in range(num_checks):
+        generator = random.Random(seed)
+        window = generator.randint(1, 20)
+        largest = generator.choice([3, 100, 10 ** 6])
+        medians = WindowMedian(window)
+        values = []
+        ordered = []
+        for i in range(length):
+            integer = generator.randint(0, largest)
+            values.append(integer)
+            bisect.insort(ordered, integer)
+            if len(values) > window:
+                del ordered[bisect.bisect_left(ordered, values[-window - 1])]
+            expected = ordered[(len(ordered) - 1) // 2]
+            if medians.add(integer) != expected:
+                raise AssertionError(
+                    'Window median mismatch for seed {} at value {}'.format(
+                        seed, i))
+            if len(medians.low) + len(medians.high) > 2 * window + 2:
+                raise AssertionError(
+                    'Window heaps keep stale entries for seed {} at value '
+                    '{}'.format(seed, i))
+    print('Window median matches a sorted window on {} random '
+          'streams'.format(num_checks))
+
+
+def measure(function, *args):
+    # run the function and return its result, running time and peak memory
+    tracemalloc.start()
+    start = time.time()
+    result = function(*args)
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def exact_median(integers):
+    median = None
+    for median in running_medians(integers):
+        pass
+    return median
+
+
+def sketch_median(integers, epsilon):
+    sketch = QuantileSketch(epsilon, seed=0)
+    for integer in integers:
+        sketch.insert(integer)
+    return sketch
+
+
+def permutation(n):
+    # a permutation of 1 ... n that is generated lazily: a step
+    # that is coprime with n visits every residue modulo n exactly once
+    step = 7919
+    while math.gcd(n, step) != 1:
+        step += 1
+    return ((i * step) % n + 1 for i in range(n))
+
+
+def report(name, value, elapsed, peak):
+    print('  {:<20} value={:<12} time={:8.2f}s peak memory={:8.1f}KB'.format(
+        name, value, elapsed, peak / 1024.0))
+
+
+def benchmark_file(epsilon):
+    with open('Median.txt', 'r') as f:
+        integers = [int(line) for line in f]
+    print('Median.txt ({} values)'.format(len(integers)))
+    median, elapsed, peak = measure(exact_median, iter(integers))
+    report('exact heaps', median, elapsed, peak)
+    sketch, elapsed, peak = measure(sketch_median, iter(integers), epsilon)
+    report('sketch eps={}'.format(epsilon), sketch.median(), elapsed, peak)
+    # the exact engine reports the lower median, which is the (n/2)th
+    # smallest number, so compare the true ranks of the 2 answers
+    ordered = sorted(integers)
+    print('  sketch rank error: {:.5f}'.format(
+        abs(bisect.bisect_right(ordered, sketch.median()) -
+            bisect.bisect_right(ordered, median)) /
+        float(len(integers))))
+
+
+def benchmark_stream(n, epsilon):
+    print('Generated permutation ({} values)'.format(n))
+    if n <= EXACT_LIMIT:
+        median, elapsed, peak = measure(exact_median, permutation(n))
+        report('exact heaps', median, elapsed, peak)
+    else:
+        print('  exact heaps          skipped, it would keep all {} '
+              'values'.format(n))
+    sketch, elapsed, peak = measure(sketch_median, permutation(n), epsilon)
+    report('sketch eps={}'.format(epsilon), sketch.median(), elapsed, peak)
+    print('  sketch keeps {} values in {} compactors'.format(
+        sketch.size, len(sketch.compactors)))
+    # the q-quantile of a permutation of 1 ... n is about q * n
+    worst = max(
+        abs(estimate - fraction * n) / float(n)
+        for fraction, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES))
+    )
+    print('  sketch worst quantile error: {:.5f}'.format(worst))
+
+
+class TimedKeyedMedians(KeyedMedians):
+    """Keyed store that records how long it takes to apply each key's
+       share of a batch.
+    """
+    def __init__(self):
+        KeyedMedians.__init__(self)
+        self.latencies = []
+
+    def add_batch(self, key, integers):
+        start = time.time()
+        KeyedMedians.add_batch(self, key, integers)
+        self.latencies.append(time.time() - start)
+
+
+def make_records(num_records, num_keys, seed):
+    generator = random.Random(seed)
+    return ''.join(
+        'metric{} {}\n'.format(generator.randrange(num_keys),
+                               generator.randrange(10 ** 6))
+        for i in range(num_records)
+    ).encode()
+
+
+async def run_ingest(store, payloads, batch_size):
+    streams = []
+    for payload in payloads:
+        reader = asyncio.StreamReader()
+        reader.feed_data(payload)
+        reader.feed_eof()
+        streams.append(reader)
+    return await ingest(store, streams, batch_size)
+
+
+def benchmark_keyed(num_records, num_keys=5000, num_streams=8):
+    print('Keyed ingestion ({} records, {} keys, {} streams)'.format(
+        num_records, num_keys, num_streams))
+    records_per_stream = num_records // num_streams
+    payloads = [
+        make_records(records_per_stream, num_keys, seed)
+        for seed in range(num_streams)
+    ]
+    for batch_size in BATCH_SIZES:
+        store = TimedKeyedMedians()
+        start = time.time()
+        count = asyncio.run(run_ingest(store, payloads, batch_size))
+        elapsed = time.time() - start
+        start = time.time()
+        snapshot = store.snapshot()
+        snapshot_time = time.time() - start
+        # every stream flushes once per batch_size records and once at the end
+        num_batches = num_streams * -(-records_per_stream // batch_size)
+        print('  batch size {:<6} {:10.0f} records/s, {:10.1f}us per batch, '
+              '{:6.2f}ms per snapshot of {} keys'.format(
+                  batch_size,
+                  count / elapsed,
+                  1e6 * sum(store.latencies) / num_batches,
+                  1e3 * snapshot_time,
+                  len(snapshot),
+              ))
+
+
+def main(n=10 ** 6, epsilon=0.01):
+    check_window()
+    benchmark_file(epsilon)
+    benchmark_stream(n, epsilon)
+    benchmark_keyed(min(n, 10 ** 6))
+
+
+if __name__ == '__main__':
+    main(*[
+        convert(arg)
+        for convert, arg in zip([int, float], sys.argv[1:])
+    ])
@@ -16,7 +16,13 @@
 # search-tree-based implementations of the algorithm.
 
 
+import asyncio
+import heapq
 import math
+from bisect import bisect_right
+import random
+import sys
+from collections import defaultdict, deque
 
 
 class Heap:
@@ -97,61 +103,469 @@ class Heap:
                 self.bubble_down(node, right_idx)
 
 
-def main():
-    with open('Median.txt', 'r') as f:
-        # contains the largest numbers
-        high_heap = Heap()
-        # contains the smallest numbers
-        low_heap = Heap()
-        median_sum = 0
-        medians = []
-
-        for idx, line in enumerate(f):
-            integer = int(line)
-            # the smallest element of the largest numbers
-            high_root = high_heap.root()
-
-            if high_root is None:
-                high_heap.insert(integer)
-            # if the integer is bigger than the high root,
-            # stick it in the high heap (largest numbers)
-            elif integer > high_root:
-                high_heap.insert(integer)
-            # otherwise stick it in the low heap (smallest numbers)
+class WindowMedian:
+    """Median of the last `window` numbers of a stream.
+       Expired numbers are deleted lazily: they are counted in the delayed
+       deletions of their heap and only popped once they reach its root.
+       When the stale entries of a heap outnumber its live ones, the heap
+       is rebuilt without them, so both heaps stay O(window) in size.
+    """
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError(
+                'Window must be at least 1, not {}'.format(window))
+        self.window = window
+        self.values = deque()
+        # max heap of the smallest numbers (keys are negated)
+        self.low = []
+        # min heap of the largest numbers
+        self.high = []
+        # the number of pending deletions of each key, for each heap
+        self.low_delayed = {}
+        self.high_delayed = {}
+        # the heaps contain stale entries, so track the live sizes separately
+        self.low_size = 0
+        self.high_size = 0
+
+    def size(self):
+        return self.low_size + self.high_size
+
+    def median(self):
+        # the low heap holds the extra number when the window is odd,
+        # so its root is the (k+1)/2th or k/2th smallest number
+        if self.low_size > 0:
+            return -self.low[0]
+
+    def add(self, integer):
+        self.values.append(integer)
+        if self.low_size == 0 or integer <= -self.low[0]:
+            heapq.heappush(self.low, -integer)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, integer)
+            self.high_size += 1
+        # evict the number that just fell out of the window
+        if len(self.values) > self.window:
+            self.remove(self.values.popleft())
+        self.rebalance()
+        return self.median()
+
+    def remove(self, integer):
+        # the number is in the low heap if it is no bigger than the low root,
+        # which is always a live number after pruning
+        if integer <= -self.low[0]:
+            self.low_size -= 1
+            self.delay(self.low, self.low_delayed, -integer, self.low_size)
+        else:
+            self.high_size -= 1
+            self.delay(self.high, self.high_delayed, integer, self.high_size)
+
+    def delay(self, heap, delayed, key, size):
+        delayed[key] = delayed.get(key, 0) + 1
+        if key == heap[0]:
+            self.prune(heap, delayed)
+        elif len(heap) > 2 * size:
+            self.compact(heap, delayed)
+
+    def prune(self, heap, delayed):
+        # pop deleted numbers off the root until the root is live
+        while heap and heap[0] in delayed:
+            self.forget(delayed, heapq.heappop(heap))
+
+    def compact(self, heap, delayed):
+        # rebuild the heap from its live entries only
+        live = []
+        for key in heap:
+            if key in delayed:
+                self.forget(delayed, key)
             else:
-                low_heap.insert(-integer)
-
-            # if the heaps are unbalanced, rebalance by
-            # removing one node from the bigger heap and
-            # inserting it into the smaller heap
-            if high_heap.size() - low_heap.size() > 1:
-                node = high_heap.extract_root()
-                low_heap.insert(-node)
-            elif low_heap.size() - high_heap.size() > 1:
-                node = -low_heap.extract_root()
-                high_heap.insert(node)
-
-            # the total number of integers seen so far is even
-            # this means that the 2 heaps have the same size
-            if high_heap.size() + low_heap.size() % 2 == 0:
-                median = low_heap.root()
-            # the total number of integers seen so far is odd
-            # this means that 1 heap has 1 more node than the other
+                live.append(key)
+        heapq.heapify(live)
+        heap[:] = live
+
+    def forget(self, delayed, key):
+        # one pending deletion of the key is done
+        if delayed[key] == 1:
+            del delayed[key]
+        else:
+            delayed[key] -= 1
+
+    def rebalance(self):
+        # keep low_size == high_size or low_size == high_size + 1
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self.prune(self.low, self.low_delayed)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self.prune(self.high, self.high_delayed)
+
+
+class QuantileSketch:
+    """KLL sketch of the quantiles of an unbounded stream.
+       Compactor h holds numbers that each stand for 2^h numbers of the
+       stream. When a compactor is full it is sorted and every other number
+       is promoted to the next level, so the sketch keeps O(1/epsilon)
+       numbers however long the stream is, and answers rank queries to
+       within epsilon * count with high probability.
+    """
+    def __init__(self, epsilon=0.01, seed=None):
+        if not 0 < epsilon < 1:
+            raise ValueError(
+                'Epsilon must be between 0 and 1, not {}'.format(epsilon))
+        self.epsilon = epsilon
+        self.k = int(math.ceil(2.0 / epsilon))
+        self.random = random.Random(seed)
+        self.compactors = [[]]
+        # the number of numbers seen and the number of numbers kept
+        self.count = 0
+        self.size = 0
+        self.max_size = self.capacity(0)
+
+    def capacity(self, height):
+        # the capacities shrink geometrically towards the bottom level
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.k * (2.0 / 3) ** depth)) + 1
+
+    def grow(self):
+        self.compactors.append([])
+        self.max_size = sum(
+            self.capacity(h) for h in range(len(self.compactors)))
+
+    def insert(self, integer):
+        self.compactors[0].append(integer)
+        self.count += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self.compress()
+
+    def compress(self):
+        for height, compactor in enumerate(self.compactors):
+            if len(compactor) >= self.capacity(height):
+                if height + 1 == len(self.compactors):
+                    self.grow()
+                compactor.sort()
+                # an odd number out stays behind at this level
+                leftover = compactor.pop() if len(compactor) % 2 else None
+                # promote the odd or the even positions at random,
+                # so that the rank errors of the compactions cancel out
+                promoted = compactor[self.random.randint(0, 1)::2]
+                self.compactors[height + 1].extend(promoted)
+                compactor[:] = [] if leftover is None else [leftover]
+                self.size -= len(promoted)
+                if self.size < self.max_size:
+                    break
+
+    def merge(self, other):
+        # combine the sketches level by level, then compact
+        # until the merged sketch is within its capacity again
+        while len(self.compactors) < len(other.compactors):
+            self.grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.count += other.count
+        self.size += other.size
+        while self.size >= self.max_size:
+            self.compress()
+        return self
+
+    def weighted(self):
+        # every number kept by the sketch with the weight that it stands for
+        return sorted(
+            (integer, 2 ** height)
+            for height, compactor in enumerate(self.compactors)
+            for integer in compactor
+        )
+
+    def rank(self, integer):
+        # the estimated number of numbers in the stream <= integer
+        return sum(
+            2 ** height * sum(1 for i in compactor if i <= integer)
+            for height, compactor in enumerate(self.compactors)
+        )
+
+    def quantiles(self, fractions):
+        weighted = self.weighted()
+        results = []
+        for fraction in fractions:
+            if not 0 <= fraction <= 1:
+                raise ValueError(
+                    'Quantile must be between 0 and 1, not {}'.format(
+                        fraction))
+            # the first number whose cumulative weight reaches the target
+            # rank; the estimated total weight is not exactly count
+            target = fraction * sum(w for i, w in weighted)
+            cumulative = 0
+            for integer, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(integer if weighted else None)
+        return results
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class RunningMedian:
+    """Median of every number seen so far, kept in two heapq heaps.
+       Only the two heap lists are stored, so that thousands of keys
+       can each have their own running median.
+    """
+    __slots__ = ('low', 'high')
+
+    def __init__(self):
+        # max heap of the smallest numbers (keys are negated)
+        self.low = []
+        # min heap of the largest numbers
+        self.high = []
+
+    def size(self):
+        return len(self.low) + len(self.high)
+
+    def median(self):
+        if self.low:
+            return -self.low[0]
+
+    def add(self, integer):
+        if not self.low or integer <= -self.low[0]:
+            heapq.heappush(self.low, -integer)
+        else:
+            heapq.heappush(self.high, integer)
+        # keep the extra number, if any, in the low heap
+        if len(self.low) > len(self.high) + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+        elif len(self.low) < len(self.high):
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+        return -self.low[0]
+
+
+class KeyedMedians:
+    """One running median per key.
+       The latest median of every key is cached once its batch has been
+       applied, so a snapshot is a dictionary copy and never waits for
+       the heaps or sees a half-applied batch.
+    """
+    def __init__(self):
+        self.heaps = {}
+        self.medians = {}
+
+    def add_batch(self, key, integers):
+        heaps = self.heaps.get(key)
+        if heaps is None:
+            heaps = self.heaps[key] = RunningMedian()
+        for integer in integers:
+            heaps.add(integer)
+        self.medians[key] = heaps.median()
+
+    def median(self, key):
+        return self.medians.get(key)
+
+    def snapshot(self):
+        return dict(self.medians)
+
+
+class OrderStatistics:
+    """Dynamic multiset of numbers supporting rank and select queries.
+       The numbers that may ever be inserted are compressed to the indices
+       1 ... m of a Fenwick tree of counts, so insert, delete, rank and
+       select all take O(log m) time, and any percentile (p50, p90, p99, ...)
+       is answered from the same index.
+    """
+    def __init__(self, universe):
+        self.values = sorted(set(universe))
+        self.index = dict((v, i + 1) for i, v in enumerate(self.values))
+        self.counts = [0] * (len(self.values) + 1)
+        self.tree = [0] * (len(self.values) + 1)
+        self.count = 0
+        # the largest power of 2 that fits in the tree, to start select from
+        self.top = 1
+        while self.top * 2 <= len(self.values):
+            self.top *= 2
+
+    def size(self):
+        return self.count
+
+    def update(self, idx, delta):
+        while idx < len(self.tree):
+            self.tree[idx] += delta
+            idx += idx & -idx
+
+    def prefix(self, idx):
+        # the number of numbers among the idx smallest values of the universe
+        total = 0
+        while idx > 0:
+            total += self.tree[idx]
+            idx -= idx & -idx
+        return total
+
+    def insert(self, integer):
+        idx = self.index.get(integer)
+        if idx is None:
+            raise ValueError('{} is not in the universe'.format(integer))
+        self.counts[idx] += 1
+        self.count += 1
+        self.update(idx, 1)
+
+    def delete(self, integer):
+        idx = self.index.get(integer)
+        if idx is None or self.counts[idx] == 0:
+            raise ValueError('{} is not in the multiset'.format(integer))
+        self.counts[idx] -= 1
+        self.count -= 1
+        self.update(idx, -1)
+
+    def rank(self, integer):
+        # the number of numbers in the multiset that are <= integer
+        return self.prefix(bisect_right(self.values, integer))
+
+    def select(self, k):
+        # the kth smallest number (1-based), found by descending the
+        # implicit tree of the Fenwick array one power of 2 at a time
+        if not 1 <= k <= self.count:
+            raise IndexError('k must be between 1 and {}, not {}'.format(
+                self.count, k))
+        idx = 0
+        step = self.top
+        while step > 0:
+            if idx + step < len(self.tree) and self.tree[idx + step] < k:
+                idx += step
+                k -= self.tree[idx]
+            step //= 2
+        return self.values[idx]
+
+    def percentile(self, fraction):
+        # the ceil(fraction * n)th smallest number, so that the 50th
+        # percentile is the median as defined in the assignment
+        if not 0 < fraction <= 1:
+            raise ValueError(
+                'Percentile must be between 0 and 1, not {}'.format(fraction))
+        return self.select(max(1, int(math.ceil(fraction * self.count))))
+
+    def percentiles(self, fractions):
+        return [self.percentile(fraction) for fraction in fractions]
+
+    def median(self):
+        return self.percentile(0.5)
+
+
+def parse_record(line):
+    # each record is a line of the form "key value"
+    if isinstance(line, bytes):
+        line = line.decode()
+    key, value = line.split()
+    return key, int(value)
+
+
+async def ingest_stream(store, lines, batch_size):
+    # buffer the numbers of each key and apply them
+    # once batch_size records have been read
+    batches = defaultdict(list)
+    buffered = 0
+    count = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        key, integer = parse_record(line)
+        batches[key].append(integer)
+        buffered += 1
+        if buffered >= batch_size:
+            for key, integers in batches.items():
+                store.add_batch(key, integers)
+            count += buffered
+            batches.clear()
+            buffered = 0
+            # give the other streams and the snapshot readers a turn
+            await asyncio.sleep(0)
+    for key, integers in batches.items():
+        store.add_batch(key, integers)
+    return count + buffered
+
+
+async def ingest(store, streams, batch_size=1000):
+    # read every stream (e.g. asyncio.StreamReader) concurrently and
+    # return the total number of records that were applied to the store
+    counts = await asyncio.gather(*[
+        ingest_stream(store, lines, batch_size)
+        for lines in streams
+    ])
+    return sum(counts)
+
+
+def windowed_medians(integers, window):
+    # yield the median of the last `window` numbers after each arrival
+    medians = WindowMedian(window)
+    for integer in integers:
+        yield medians.add(integer)
+
+
+def running_medians(integers):
+    # contains the largest numbers
+    high_heap = Heap()
+    # contains the smallest numbers
+    low_heap = Heap()
+
+    for integer in integers:
+        # the smallest element of the largest numbers
+        high_root = high_heap.root()
+
+        if high_root is None:
+            high_heap.insert(integer)
+        # if the integer is bigger than the high root,
+        # stick it in the high heap (largest numbers)
+        elif integer > high_root:
+            high_heap.insert(integer)
+        # otherwise stick it in the low heap (smallest numbers)
+        else:
+            low_heap.insert(-integer)
+
+        # if the heaps are unbalanced, rebalance by
+        # removing one node from the bigger heap and
+        # inserting it into the smaller heap
+        if high_heap.size() - low_heap.size() > 1:
+            node = high_heap.extract_root()
+            low_heap.insert(-node)
+        elif low_heap.size() - high_heap.size() > 1:
+            node = -low_heap.extract_root()
+            high_heap.insert(node)
+
+        # the total number of integers seen so far is even
+        # this means that the 2 heaps have the same size
+        if high_heap.size() + low_heap.size() % 2 == 0:
+            median = low_heap.root()
+        # the total number of integers seen so far is odd
+        # this means that 1 heap has 1 more node than the other
+        else:
+            # the high heap is the heap with the extra node
+            if high_heap.size() > low_heap.size():
+                median = high_heap.root()
+            # the low heap is the heap with the extra node
             else:
-                # the high heap is the heap with the extra node
-                if high_heap.size() > low_heap.size():
-                    median = high_heap.root()
-                # the low heap is the heap with the extra node
-                else:
-                    median = -low_heap.root()
+                median = -low_heap.root()
+
+        yield median
 
-            medians.append(median)
-            median_sum += median
 
+def main(window=None):
+    if window is not None:
+        with open('Median.txt', 'r') as f:
+            medians = windowed_medians((int(line) for line in f), window)
+            print('The sum of the medians over a window of {} '
+                  'mod 10,000 is {}.'.format(window, sum(medians) % 10000))
+        return
+
+    with open('Median.txt', 'r') as f:
+        medians = list(running_medians(int(line) for line in f))
         print('The sum of the medians mod 10,000 is {}.'.format(
             sum(medians) % 10000,
         ))
 
 
 if __name__ == '__main__':
-    main()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -19,7 +19,18 @@
 # you ever find.)
 
 
+import math
+import multiprocessing
 import random
+import sys
+from array import array
+
+
+# the edge arrays of the graph, set once in each worker process
+# of the parallel trial runner so that batches don't resend them
+WORKER_GRAPH = None
+# Karger-Stein cuts graphs of up to this many vertices with Stoer-Wagner
+BASE_CASE_SIZE = 32
 
 
 def get_edges(graph):
@@ -62,6 +73,10 @@ def merge_vertices(graph, v1, v2):
 
 
 def compute_min_cut(graph):
+    # work on a copy, so that the caller's graph
+    # is intact for the next trial
+    graph = dict((vertex, list(adjacents))
+                 for vertex, adjacents in graph.items())
     num_vertices = len(graph.keys())
     edges = get_edges(graph)
     # merge 2 vertices until there are only 2 vertices left
@@ -77,7 +92,325 @@ def compute_min_cut(graph):
     return len(edges) / 2
 
 
-def main():
+def get_edge_array(graph):
+    # relabel the vertices 0 ... n-1 and list each undirected edge once,
+    # as the tails and heads of 2 flat arrays
+    labels = dict((vertex, idx) for idx, vertex in enumerate(graph.keys()))
+    tails = array('i')
+    heads = array('i')
+    for vertex, adjacents in graph.items():
+        for adjacent in adjacents:
+            if vertex < adjacent:
+                tails.append(labels[vertex])
+                heads.append(labels[adjacent])
+    return len(labels), tails, heads
+
+
+def find(forest, node):
+    # the leader node points to itself; on the way up,
+    # point every other node at its grandparent
+    while node != forest[node]:
+        forest[node] = forest[forest[node]]
+        node = forest[node]
+    return node
+
+
+def union(forest, sizes, leader1, leader2):
+    # point the leader of the smaller super-vertex
+    # at the leader of the larger super-vertex
+    if sizes[leader1] < sizes[leader2]:
+        leader1, leader2 = leader2, leader1
+    forest[leader2] = leader1
+    sizes[leader1] += sizes[leader2]
+
+
+def contract(num_vertices, tails, heads, order, target=2):
+    # contracting the edges in a random order is the same as picking a
+    # random remaining edge each time, with edges that have become
+    # self-loops skipped; the super-vertices are a union-find forest
+    forest = list(range(num_vertices))
+    sizes = [1] * num_vertices
+    remaining = num_vertices
+    for edge in order:
+        if remaining <= target:
+            break
+        leader1 = find(forest, tails[edge])
+        leader2 = find(forest, heads[edge])
+        if leader1 != leader2:
+            union(forest, sizes, leader1, leader2)
+            remaining -= 1
+    return forest
+
+
+def count_crossing_edges(forest, tails, heads):
+    return sum(
+        1 for tail, head in zip(tails, heads)
+        if find(forest, tail) != find(forest, head)
+    )
+
+
+def karger_trial(num_vertices, tails, heads, rng=random):
+    # shuffle the edge array once, contract until 2 super-vertices
+    # remain and count the edges that cross between them
+    order = list(range(len(tails)))
+    rng.shuffle(order)
+    forest = contract(num_vertices, tails, heads, order)
+    return count_crossing_edges(forest, tails, heads)
+
+
+def relabel(forest, tails, heads, weights):
+    # the contracted graph: one vertex per super-vertex, and one
+    # weighted edge per pair of adjacent super-vertices, whose weight
+    # is the number of parallel edges between them. Each pair is keyed
+    # by the single int tail * n + head, with tail < head
+    num_vertices = len(forest)
+    labels = [-1] * num_vertices
+    num_labels = 0
+    for node in range(num_vertices):
+        leader = find(forest, node)
+        if labels[leader] < 0:
+            labels[leader] = num_labels
+            num_labels += 1
+        labels[node] = labels[leader]
+    merged = {}
+    for tail, head, weight in zip(tails, heads, weights):
+        tail = labels[tail]
+        head = labels[head]
+        if tail < head:
+            key = tail * num_labels + head
+        elif head < tail:
+            key = head * num_labels + tail
+        else:
+            continue
+        merged[key] = merged.get(key, 0) + weight
+    keys = array('q', merged)
+    return (
+        num_labels,
+        array('i', [key // num_labels for key in keys]),
+        array('i', [key % num_labels for key in keys]),
+        array('i', merged.values()),
+    )
+
+
+def contraction_target(num_vertices):
+    return int(math.ceil(1 + num_vertices / math.sqrt(2)))
+
+
+def karger_stein(num_vertices, tails, heads, weights, rng=random):
+    # base case: small graphs are cut exactly; near the bottom each level
+    # only removes a vertex or 2 while doubling the calls, so stopping
+    # at BASE_CASE_SIZE vertices saves most of the recursion tree
+    if num_vertices <= BASE_CASE_SIZE:
+        return stoer_wagner(num_vertices, tails, heads, weights)[0]
+    # a min cut survives contraction down to n / sqrt(2) vertices with
+    # probability >= 1/2, so contract that far twice independently,
+    # recurse on both contracted graphs and keep the better cut
+    target = contraction_target(num_vertices)
+    smallest = None
+    for i in range(2):
+        # contracting in increasing order of exponential keys with rate
+        # = weight picks each next edge with probability proportional to
+        # its weight, just like picking one of the parallel edges
+        keys = [rng.expovariate(weight) for weight in weights]
+        order = sorted(range(len(weights)), key=keys.__getitem__)
+        forest = contract(num_vertices, tails, heads, order, target)
+        contracted = relabel(forest, tails, heads, weights)
+        # if the contraction got stuck, the graph is disconnected
+        if contracted[0] > target:
+            return 0
+        cut = karger_stein(*contracted, rng=rng)
+        if smallest is None or cut < smallest:
+            smallest = cut
+    return smallest
+
+
+def karger_stein_min_cut(num_vertices, tails, heads,
+                         failure_probability=0.01, seed=None):
+    # with d levels of contraction above the base case, each run finds a
+    # min cut with probability >= 1 / (d + 1), so (d + 1) *
+    # ln(1 / failure_probability) runs all miss it with probability
+    # <= failure_probability
+    if num_vertices < 2:
+        raise ValueError('A cut needs at least 2 vertices, not {}'.format(
+            num_vertices))
+    if not 0 < failure_probability < 1:
+        raise ValueError(
+            'Failure probability must be between 0 and 1, not {}'.format(
+                failure_probability))
+    rng = random.Random(seed)
+    depth = 0
+    size = num_vertices
+    while size > BASE_CASE_SIZE:
+        size = contraction_target(size)
+        depth += 1
+    # a graph that is already small enough is cut exactly in 1 run
+    num_runs = int(math.ceil(
+        (depth + 1) * math.log(1 / failure_probability))) if depth else 1
+    # merge the parallel edges of the input into weighted edges
+    forest = list(range(num_vertices))
+    graph = relabel(forest, tails, heads, array('i', [1]) * len(tails))
+    return min(
+        karger_stein(*graph, rng=rng)
+        for i in range(num_runs)
+    )
+
+
+class IndexedHeap:
+    """Implementation of an indexed max heap of vertices.
+       The heap keeps the position of every vertex, so that the key of any
+       vertex can be increased in O(log n) time without searching for it.
+    """
+    def __init__(self, vertices):
+        # every key starts at 0, so any order is a valid heap
+        self.nodes = list(vertices)
+        self.keys = dict((vertex, 0) for vertex in self.nodes)
+        self.positions = dict(
+            (vertex, idx) for idx, vertex in enumerate(self.nodes))
+
+    def is_empty(self):
+        return len(self.nodes) == 0
+
+    def contains(self, vertex):
+        return vertex in self.positions
+
+    def swap(self, idx1, idx2):
+        nodes = self.nodes
+        nodes[idx1], nodes[idx2] = nodes[idx2], nodes[idx1]
+        self.positions[nodes[idx1]] = idx1
+        self.positions[nodes[idx2]] = idx2
+
+    def extract_max(self):
+        self.swap(0, len(self.nodes) - 1)
+        vertex = self.nodes.pop()
+        del self.positions[vertex]
+        self.bubble_down(0)
+        return vertex, self.keys.pop(vertex)
+
+    def increase_key(self, vertex, delta):
+        self.keys[vertex] += delta
+        self.bubble_up(self.positions[vertex])
+
+    def bubble_up(self, idx):
+        # swap with the parent until the parent's key is at least as big
+        while idx > 0:
+            parent_idx = (idx - 1) // 2
+            if self.keys[self.nodes[parent_idx]] >= self.keys[self.nodes[idx]]:
+                break
+            self.swap(idx, parent_idx)
+            idx = parent_idx
+
+    def bubble_down(self, idx):
+        # swap with the biggest child until both children are smaller
+        while True:
+            biggest = idx
+            for child in (2 * idx + 1, 2 * idx + 2):
+                if (child < len(self.nodes) and
+                        self.keys[self.nodes[child]] >
+                        self.keys[self.nodes[biggest]]):
+                    biggest = child
+            if biggest == idx:
+                break
+            self.swap(idx, biggest)
+            idx = biggest
+
+
+def stoer_wagner(num_vertices, tails, heads, weights=None):
+    # deterministic global min cut: each phase orders the super-vertices by
+    # maximum adjacency to the ones already added; the last vertex t of the
+    # order is separated from the rest by a cut whose weight is its key,
+    # which is a min s-t cut for the last 2 vertices s and t, so the
+    # smallest cut of a phase over all phases (merging s and t after each)
+    # is a global min cut. Returns the cut and one side of it
+    if num_vertices < 2:
+        raise ValueError('A cut needs at least 2 vertices, not {}'.format(
+            num_vertices))
+    if weights is None:
+        weights = array('i', [1]) * len(tails)
+    # the weighted adjacency of the super-vertices
+    graph = dict((vertex, {}) for vertex in range(num_vertices))
+    for tail, head, weight in zip(tails, heads, weights):
+        if tail != head:
+            graph[tail][head] = graph[tail].get(head, 0) + weight
+            graph[head][tail] = graph[head].get(tail, 0) + weight
+    # the original vertices that each super-vertex is made of
+    members = dict((vertex, [vertex]) for vertex in range(num_vertices))
+
+    smallest = None
+    side = None
+    while len(graph) > 1:
+        heap = IndexedHeap(graph.keys())
+        s = t = None
+        while not heap.is_empty():
+            s = t
+            t, key = heap.extract_max()
+            for vertex, weight in graph[t].items():
+                if heap.contains(vertex):
+                    heap.increase_key(vertex, weight)
+        # the cut of the phase separates t from everything else
+        if smallest is None or key < smallest:
+            smallest = key
+            side = list(members[t])
+        # merge t into s
+        for vertex, weight in graph.pop(t).items():
+            del graph[vertex][t]
+            if vertex != s:
+                graph[s][vertex] = graph[s].get(vertex, 0) + weight
+                graph[vertex][s] = graph[vertex].get(s, 0) + weight
+        members[s].extend(members.pop(t))
+    return smallest, sorted(side)
+
+
+def init_worker(num_vertices, tails, heads):
+    global WORKER_GRAPH
+    WORKER_GRAPH = (num_vertices, tails, heads)
+
+
+def run_batch(task):
+    # each batch has its own seed, so the trials are reproducible
+    # whichever worker happens to run them
+    seed, batch_size = task
+    rng = random.Random(seed)
+    return [karger_trial(*WORKER_GRAPH, rng=rng) for i in range(batch_size)]
+
+
+def parallel_min_cut(num_vertices, tails, heads, max_trials=None,
+                     batch_size=100, confirmations=10, processes=None,
+                     seed=0):
+    # hand out seeded batches of Karger trials to a process pool, and stop
+    # early once the smallest cut so far has been found `confirmations`
+    # times; returns the cut, how often it was seen and the trials run
+    if max_trials is None:
+        max_trials = num_vertices ** 2
+    num_batches = -(-max_trials // batch_size)
+    tasks = (
+        ('{}-{}'.format(seed, i), batch_size)
+        for i in range(num_batches)
+    )
+    smallest = None
+    seen = 0
+    num_trials = 0
+    pool = multiprocessing.Pool(processes, initializer=init_worker,
+                                initargs=(num_vertices, tails, heads))
+    try:
+        # results come back in batch order, so a given seed
+        # always stops after the same batch
+        for cuts in pool.imap(run_batch, tasks):
+            num_trials += len(cuts)
+            for cut in cuts:
+                if smallest is None or cut < smallest:
+                    smallest = cut
+                    seen = 1
+                elif cut == smallest:
+                    seen += 1
+            if seen >= confirmations:
+                break
+    finally:
+        pool.terminate()
+        pool.join()
+    return smallest, seen, num_trials
+
+
+def main(engine='karger'):
     with open('kargerMinCut.txt', 'r') as f:
         # represent the graph with a dict, where the key is the vertex
         # and the value is a list of all of the vertices it shares edges with
@@ -89,14 +422,28 @@ def main():
         # to maximize the probability of getting the minimum cut,
         # run the algorithm to compute the min cut n^2 times
         # where n is the number of vertices in the graph
-        num_vertices = len(graph.keys())
-        smallest = None
-        for i in range(0, num_vertices**2):
-            min_cut = compute_min_cut(graph)
-            if smallest is None or min_cut < smallest:
-                smallest = min_cut
+        num_vertices, tails, heads = get_edge_array(graph)
+        if engine == 'karger':
+            smallest = None
+            for i in range(0, num_vertices**2):
+                min_cut = karger_trial(num_vertices, tails, heads)
+                if smallest is None or min_cut < smallest:
+                    smallest = min_cut
+        elif engine == 'parallel':
+            smallest, seen, num_trials = parallel_min_cut(
+                num_vertices, tails, heads)
+            print('Found the smallest cut {} times in {} trials.'.format(
+                seen, num_trials))
+        # Stoer-Wagner is deterministic, so a single run is enough
+        elif engine == 'stoer-wagner':
+            smallest, side = stoer_wagner(num_vertices, tails, heads)
+        # Karger-Stein only needs O(log^2 n) runs of its recursion
+        elif engine == 'karger-stein':
+            smallest = karger_stein_min_cut(num_vertices, tails, heads)
+        else:
+            raise ValueError('Unknown engine {}'.format(engine))
         print('The min cut is {}.'.format(smallest))
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
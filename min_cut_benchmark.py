@@ -0,0 +1,97 @@
+# Compare the min cut engines in min_cut.py. The deterministic Stoer-Wagner
+# engine gives the true min cut of each graph, which is used to measure how
+# often a single Karger trial and a single Karger-Stein recursion find it,
+# along with the running time of each engine.
+#
+# The graphs are kargerMinCut.txt and generated graphs made of 2 dense random
+# halves joined by a few random edges. Run it with the generated graph sizes
+# as arguments, for example "python min_cut_benchmark.py 200 400 800".
+
+
+import random
+import sys
+import time
+from array import array
+
+from min_cut import (
+    get_edge_array,
+    karger_stein,
+    karger_trial,
+    relabel,
+    stoer_wagner,
+)
+
+
+NUM_TRIALS = 200
+NUM_RUNS = 10
+SIZES = [100, 200, 400]
+
+
+def read_graph(filename):
+    graph = dict()
+    with open(filename, 'r') as f:
+        for line in f:
+            vertices = [int(v) for v in line.split()]
+            graph[vertices[0]] = vertices[1:]
+    return get_edge_array(graph)
+
+
+def planted_graph(num_vertices, probability=0.3, crossing=5, seed=0):
+    # 2 random halves with edge probability `probability`,
+    # joined by `crossing` random edges
+    rng = random.Random(seed)
+    half = num_vertices // 2
+    tails = array('i')
+    heads = array('i')
+    for tail in range(num_vertices):
+        for head in range(tail + 1, num_vertices):
+            if (tail < half) == (head < half) and rng.random() < probability:
+                tails.append(tail)
+                heads.append(head)
+    for i in range(crossing):
+        tails.append(rng.randrange(half))
+        heads.append(rng.randrange(half, num_vertices))
+    return num_vertices, tails, heads
+
+
+def benchmark(name, num_vertices, tails, heads):
+    print('{} ({} vertices, {} edges)'.format(
+        name, num_vertices, len(tails)))
+
+    start = time.time()
+    min_cut, side = stoer_wagner(num_vertices, tails, heads)
+    print('  stoer-wagner   cut={:<6} {:8.3f}s'.format(
+        min_cut, time.time() - start))
+
+    rng = random.Random(0)
+    start = time.time()
+    hits = sum(
+        1 for i in range(NUM_TRIALS)
+        if karger_trial(num_vertices, tails, heads, rng) == min_cut
+    )
+    print('  karger trial   success={:6.1%} {:8.3f}s per trial'.format(
+        float(hits) / NUM_TRIALS, (time.time() - start) / NUM_TRIALS))
+
+    # Karger-Stein works on the graph with its parallel edges merged
+    graph = relabel(list(range(num_vertices)), tails, heads,
+                    array('i', [1]) * len(tails))
+    start = time.time()
+    hits = sum(
+        1 for i in range(NUM_RUNS)
+        if karger_stein(*graph, rng=rng) == min_cut
+    )
+    print('  karger-stein   success={:6.1%} {:8.3f}s per run'.format(
+        float(hits) / NUM_RUNS, (time.time() - start) / NUM_RUNS))
+
+
+def main(sizes=SIZES):
+    benchmark('kargerMinCut.txt', *read_graph('kargerMinCut.txt'))
+    for size in sizes:
+        benchmark('planted graph', *planted_graph(size, seed=size))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main()
@@ -29,10 +29,20 @@
 # their positions in the heap.
 
 
+import heapq
+import math
+import multiprocessing
+import sys
+from array import array
 from collections import defaultdict
 from dijkstra import Heap, Node
 
 
+# the edge arrays of the graph, set once in each worker
+# process of the parallel Boruvka engine
+WORKER_EDGES = None
+
+
 def prim(edges, num_nodes):
     # choose a vertex to start with
     source = 1
@@ -69,7 +79,408 @@ def prim(edges, num_nodes):
     return total_cost
 
 
-def main():
+def lazy_prim(edges, num_nodes):
+    # keep crossing edges in a heapq heap keyed by cost, and skip the
+    # stale entries for vertices that were processed after they were pushed
+    source = 1
+    processed = set([source])
+    total_cost = 0
+    heap = [(c, v) for v, c in edges[source].items()]
+    heapq.heapify(heap)
+    while heap and len(processed) < num_nodes:
+        c, v = heapq.heappop(heap)
+        if v in processed:
+            continue
+        processed.add(v)
+        total_cost += c
+        for w, c in edges[v].items():
+            if w not in processed:
+                heapq.heappush(heap, (c, w))
+    return total_cost
+
+
+def get_edge_array(edges):
+    # each undirected edge once, as 3 flat arrays
+    tails = array('i')
+    heads = array('i')
+    costs = array('q')
+    for v1, adjacents in edges.items():
+        for v2, c in adjacents.items():
+            if v1 < v2:
+                tails.append(v1)
+                heads.append(v2)
+                costs.append(c)
+    return tails, heads, costs
+
+
+def find(forest, node):
+    # the leader node points to itself; on the way up,
+    # point every other node at its grandparent
+    while node != forest[node]:
+        forest[node] = forest[forest[node]]
+        node = forest[node]
+    return node
+
+
+def union(forest, sizes, leader1, leader2):
+    # point the leader of the smaller component
+    # at the leader of the larger component
+    if sizes[leader1] < sizes[leader2]:
+        leader1, leader2 = leader2, leader1
+    forest[leader2] = leader1
+    sizes[leader1] += sizes[leader2]
+
+
+def kruskal(edges, num_nodes):
+    # add the edges in increasing order of cost,
+    # unless they close a cycle in the union-find forest
+    tails, heads, costs = get_edge_array(edges)
+    forest = list(range(num_nodes + 1))
+    sizes = [1] * (num_nodes + 1)
+    total_cost = 0
+    num_tree_edges = 0
+    for edge in sorted(range(len(costs)), key=costs.__getitem__):
+        leader1 = find(forest, tails[edge])
+        leader2 = find(forest, heads[edge])
+        if leader1 != leader2:
+            union(forest, sizes, leader1, leader2)
+            total_cost += costs[edge]
+            num_tree_edges += 1
+            if num_tree_edges == num_nodes - 1:
+                break
+    return total_cost
+
+
+def cheapest_edges(labels, tails, heads, costs, edge_indices):
+    # the cheapest edge leaving each component, ties broken by edge index
+    # so that the chosen edges can never close a cycle
+    cheapest = {}
+    for edge in edge_indices:
+        label1 = labels[tails[edge]]
+        label2 = labels[heads[edge]]
+        if label1 == label2:
+            continue
+        key = (costs[edge], edge)
+        for label in (label1, label2):
+            if label not in cheapest or key < cheapest[label]:
+                cheapest[label] = key
+    return cheapest
+
+
+def init_worker(tails, heads, costs):
+    global WORKER_EDGES
+    WORKER_EDGES = (tails, heads, costs)
+
+
+def cheapest_edges_chunk(task):
+    labels, start, stop = task
+    return cheapest_edges(labels, *WORKER_EDGES,
+                          edge_indices=range(start, stop))
+
+
+def boruvka(edges, num_nodes, processes=None):
+    # every round, each component picks its cheapest outgoing edge in one
+    # pass over the edge array and all of the picked edges are contracted
+    # at once, so the number of components at least halves every round.
+    # With processes, each pass is split into chunks for a process pool.
+    # Returns the total cost and the (v1, v2, cost) edges of the tree
+    tails, heads, costs = get_edge_array(edges)
+    forest = list(range(num_nodes + 1))
+    sizes = [1] * (num_nodes + 1)
+    labels = array('i', forest)
+    total_cost = 0
+    tree_edges = []
+    # the edges that still join 2 different components
+    remaining = list(range(len(costs)))
+    pool = None
+    if processes is not None:
+        pool = multiprocessing.Pool(processes, initializer=init_worker,
+                                    initargs=(tails, heads, costs))
+    try:
+        while remaining:
+            if pool is None:
+                cheapest = cheapest_edges(labels, tails, heads, costs,
+                                          remaining)
+            else:
+                # the workers scan the whole edge array, split in chunks,
+                # and the cheapest edges of the chunks are merged here
+                chunk_size = -(-len(costs) // processes)
+                cheapest = {}
+                for chunk in pool.map(cheapest_edges_chunk, [
+                        (labels, start, min(start + chunk_size, len(costs)))
+                        for start in range(0, len(costs), chunk_size)]):
+                    for label, key in chunk.items():
+                        if label not in cheapest or key < cheapest[label]:
+                            cheapest[label] = key
+            if not cheapest:
+                break
+            for c, edge in set(cheapest.values()):
+                leader1 = find(forest, tails[edge])
+                leader2 = find(forest, heads[edge])
+                if leader1 != leader2:
+                    union(forest, sizes, leader1, leader2)
+                    total_cost += c
+                    tree_edges.append((tails[edge], heads[edge], c))
+            # contract: label every vertex with its component's leader
+            # and drop the edges that are now inside a component
+            labels = array('i', [find(forest, v) for v in range(len(forest))])
+            remaining = [
+                edge for edge in remaining
+                if labels[tails[edge]] != labels[heads[edge]]
+            ]
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return total_cost, tree_edges
+
+
+def boruvka_cost(edges, num_nodes):
+    return boruvka(edges, num_nodes)[0]
+
+
+class LinkCutTree:
+    """Implementation of a link-cut tree over the nodes 1 ... n.
+       Every preferred path is a splay tree keyed by depth, stored in flat
+       lists of children and parents (0 means no node). Each node keeps the
+       node with the largest value in its splay subtree, so the maximum on
+       any tree path is found in O(log n) amortized time.
+    """
+    def __init__(self, num_nodes):
+        size = num_nodes + 1
+        self.left = [0] * size
+        self.right = [0] * size
+        self.parent = [0] * size
+        self.flipped = [False] * size
+        self.value = [float('-inf')] * size
+        self.best = list(range(size))
+
+    def add_node(self, value):
+        self.left.append(0)
+        self.right.append(0)
+        self.parent.append(0)
+        self.flipped.append(False)
+        self.value.append(value)
+        self.best.append(len(self.best))
+        return len(self.best) - 1
+
+    def is_root(self, node):
+        # the root of a splay tree only has a path-parent pointer
+        parent = self.parent[node]
+        return parent == 0 or (self.left[parent] != node and
+                               self.right[parent] != node)
+
+    def push(self, node):
+        # apply a pending reversal of the path to the node's children
+        if self.flipped[node]:
+            left, right = self.left[node], self.right[node]
+            self.left[node], self.right[node] = right, left
+            self.flipped[left] = not self.flipped[left]
+            self.flipped[right] = not self.flipped[right]
+            self.flipped[node] = False
+
+    def update(self, node):
+        best = node
+        for child in (self.left[node], self.right[node]):
+            if child and self.value[self.best[child]] > self.value[best]:
+                best = self.best[child]
+        self.best[node] = best
+
+    def rotate(self, node):
+        parent = self.parent[node]
+        grandparent = self.parent[parent]
+        parent_is_root = self.is_root(parent)
+        if self.left[parent] == node:
+            child = self.right[node]
+            self.left[parent] = child
+            self.right[node] = parent
+        else:
+            child = self.left[node]
+            self.right[parent] = child
+            self.left[node] = parent
+        if child:
+            self.parent[child] = parent
+        self.parent[parent] = node
+        self.parent[node] = grandparent
+        if not parent_is_root:
+            if self.left[grandparent] == parent:
+                self.left[grandparent] = node
+            else:
+                self.right[grandparent] = node
+        self.update(parent)
+        self.update(node)
+
+    def splay(self, node):
+        # push the pending reversals down from the root of the splay tree
+        path = [node]
+        while not self.is_root(path[-1]):
+            path.append(self.parent[path[-1]])
+        for ancestor in reversed(path):
+            self.push(ancestor)
+        while not self.is_root(node):
+            parent = self.parent[node]
+            if not self.is_root(parent):
+                grandparent = self.parent[parent]
+                if ((self.left[parent] == node) ==
+                        (self.left[grandparent] == parent)):
+                    self.rotate(parent)
+                else:
+                    self.rotate(node)
+            self.rotate(node)
+
+    def access(self, node):
+        # make the path from the root of the tree to node preferred
+        last = 0
+        current = node
+        while current:
+            self.splay(current)
+            self.right[current] = last
+            self.update(current)
+            last = current
+            current = self.parent[current]
+        self.splay(node)
+
+    def make_root(self, node):
+        self.access(node)
+        self.flipped[node] = not self.flipped[node]
+
+    def find_root(self, node):
+        self.access(node)
+        self.push(node)
+        while self.left[node]:
+            node = self.left[node]
+            self.push(node)
+        self.splay(node)
+        return node
+
+    def connected(self, node1, node2):
+        return node1 == node2 or self.find_root(node1) == self.find_root(node2)
+
+    def link(self, node1, node2):
+        self.make_root(node1)
+        self.parent[node1] = node2
+
+    def cut(self, node1, node2):
+        # after this, node1 is the only node before node2 on their path
+        self.make_root(node1)
+        self.access(node2)
+        self.left[node2] = 0
+        self.parent[node1] = 0
+        self.update(node2)
+
+    def path_max(self, node1, node2):
+        # the node with the largest value on the path from node1 to node2
+        self.make_root(node1)
+        self.access(node2)
+        return self.best[node2]
+
+
+class DynamicMST:
+    """Minimum spanning forest that is kept up to date as edges are
+       inserted or become cheaper. Each tree edge is a node of a link-cut
+       tree valued with its cost, between the nodes of its 2 vertices, so
+       the most expensive edge on the tree path between the endpoints of a
+       new edge is found, and swapped out if the new edge is cheaper, in
+       O(log n) amortized time instead of rebuilding the whole tree.
+    """
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.tree = LinkCutTree(num_nodes)
+        self.total_cost = 0
+        # the link-cut tree node of each tree edge, and the reverse
+        self.tree_edges = {}
+        self.endpoints = {}
+        # nodes of edges that left the tree, for reuse
+        self.free_nodes = []
+
+    @classmethod
+    def from_edges(cls, edges, num_nodes):
+        # start from the tree that the Boruvka engine computes from scratch
+        dynamic_mst = cls(num_nodes)
+        for v1, v2, c in boruvka(edges, num_nodes)[1]:
+            dynamic_mst.link(v1, v2, c)
+        return dynamic_mst
+
+    def cost(self):
+        return self.total_cost
+
+    def edges(self):
+        return [
+            (v1, v2, self.tree.value[node])
+            for (v1, v2), node in self.tree_edges.items()
+        ]
+
+    def link(self, v1, v2, c):
+        if self.free_nodes:
+            node = self.free_nodes.pop()
+            self.tree.value[node] = c
+            self.tree.best[node] = node
+        else:
+            node = self.tree.add_node(c)
+        key = (min(v1, v2), max(v1, v2))
+        self.tree.link(v1, node)
+        self.tree.link(node, v2)
+        self.tree_edges[key] = node
+        self.endpoints[node] = key
+        self.total_cost += c
+
+    def cut(self, node):
+        v1, v2 = self.endpoints.pop(node)
+        del self.tree_edges[(v1, v2)]
+        self.tree.cut(v1, node)
+        self.tree.cut(node, v2)
+        self.total_cost -= self.tree.value[node]
+        self.free_nodes.append(node)
+
+    def insert(self, v1, v2, c):
+        # insert an edge, or lower the cost of an existing one; returns
+        # whether the tree changed. Edges that aren't in the tree are not
+        # kept, as costs only go down they can never re-enter the tree
+        if v1 == v2:
+            return False
+        node = self.tree_edges.get((min(v1, v2), max(v1, v2)))
+        if node is not None:
+            # a tree edge that gets cheaper stays in the tree
+            if c >= self.tree.value[node]:
+                return False
+            self.cut(node)
+            self.link(v1, v2, c)
+            return True
+        if not self.tree.connected(v1, v2):
+            self.link(v1, v2, c)
+            return True
+        # the new edge closes a cycle with the tree path between its
+        # endpoints; the most expensive edge on that cycle has to go
+        heaviest = self.tree.path_max(v1, v2)
+        if self.tree.value[heaviest] <= c:
+            return False
+        self.cut(heaviest)
+        self.link(v1, v2, c)
+        return True
+
+
+ENGINES = {
+    'prim': prim,
+    'lazy-prim': lazy_prim,
+    'kruskal': kruskal,
+    'boruvka': boruvka_cost,
+}
+
+
+def mst(edges, num_nodes, engine='auto'):
+    # Kruskal's sort dominates on sparse graphs, whereas lazy Prim only
+    # touches the heap entries it needs, so it wins once the average
+    # degree is more than about log2(n)
+    if engine == 'auto':
+        num_edges = sum(len(adjacents) for adjacents in edges.values()) // 2
+        if num_edges > num_nodes * math.log(max(num_nodes, 2), 2):
+            engine = 'lazy-prim'
+        else:
+            engine = 'kruskal'
+    return ENGINES[engine](edges, num_nodes)
+
+
+def main(engine='auto'):
     with open('edges.txt', 'r') as f:
         # store the graph as a dictionary of edges, where
         # the keys are the vertices and for each vertex,
@@ -86,9 +497,9 @@ def main():
             edges[v2][v1] = cost
 
         print('The overall cost of the minimum spanning tree is {}'.format(
-            prim(edges, num_nodes)
+            mst(edges, num_nodes, engine)
         ))
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
@@ -22,6 +22,23 @@
 # integer --- in the box below.
 
 
+import heapq
+import mmap
+import random
+import sys
+from array import array
+from collections import Counter
+from math import gcd
+
+
+# the columnar engine keeps one count per distinct (weight, length) pair,
+# so it suits many jobs with few distinct pairs, like jobs.txt whose
+# weights and lengths are 1 ... 100; memory-mapped files with more
+# distinct pairs than this are rejected instead of filling memory
+MAX_DISTINCT_JOBS = 10 ** 6
+# the number of jobs counted at a time from a memory-mapped file
+CHUNK_SIZE = 2 ** 20
+
 class Job:
 
     def __init__(self, weight, length):
@@ -42,23 +59,386 @@ def schedule(jobs):
     return weighted_sum
 
 
-def main():
-    with open('jobs.txt', 'r') as f:
+def read_job_counts(filename):
+    # columnar form of a jobs.txt file: the number of jobs
+    # with each (weight, length) pair
+    with open(filename, 'r') as f:
         # skip the first line that contains the number of jobs
         next(f)
+        return Counter(
+            tuple(int(n) for n in line.split())
+            for line in f if line.strip()
+        )
+
+
+def write_jobs(filename, jobs):
+    # store (weight, length) pairs as consecutive native int32s
+    with open(filename, 'wb') as f:
+        pairs = array('i')
+        for weight, length in jobs:
+            pairs.append(weight)
+            pairs.append(length)
+            if len(pairs) >= 2 ** 20:
+                pairs.tofile(f)
+                del pairs[:]
+        pairs.tofile(f)
+
+
+def map_job_counts(filename, max_distinct=MAX_DISTINCT_JOBS):
+    # count the (weight, length) pairs of a file written by write_jobs
+    # through a memory map: each pair is viewed as a single int64, so
+    # Counter walks the file in C without copying it or creating a
+    # Python object per job. The file is counted a chunk at a time, to
+    # stop as soon as it has more than max_distinct distinct pairs
+    with open(filename, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return Counter()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped).cast('q')
+            try:
+                packed = Counter()
+                for start in range(0, len(view), CHUNK_SIZE):
+                    chunk = view[start:start + CHUNK_SIZE]
+                    try:
+                        packed.update(chunk)
+                    finally:
+                        chunk.release()
+                    if len(packed) > max_distinct:
+                        raise ValueError(
+                            '{} has more than {} distinct (weight, length) '
+                            'pairs'.format(filename, max_distinct))
+            finally:
+                view.release()
+    counts = Counter()
+    for key, count in packed.items():
+        first, second = key & 0xFFFFFFFF, (key >> 32) & 0xFFFFFFFF
+        if sys.byteorder == 'big':
+            first, second = second, first
+        counts[(first, second)] += count
+    return counts
+
+
+def diff_key(job):
+    # decreasing (weight - length), ties broken by higher weight
+    weight, length = job
+    return (weight - length, weight)
+
+
+def ratio_key(max_length):
+    # an exact integer key for weight / length: 2 different ratios with
+    # lengths <= max_length differ by at least 1 / max_length^2, so
+    # scaling by max_length^2 and rounding down keeps them apart, while
+    # equal ratios get equal keys (whose order doesn't change the sum)
+    scale = max_length ** 2
+    return lambda job: job[0] * scale // job[1]
+
+
+def schedule_counts(job_counts, key):
+    # the jobs with the same weight and length are scheduled back to back,
+    # so each group is summed in closed form: the ith of `count` jobs
+    # completes at completion_time + i * length
+    completion_time = 0
+    weighted_sum = 0
+    for job in sorted(job_counts, key=key, reverse=True):
+        weight, length = job
+        count = job_counts[job]
+        weighted_sum += weight * (
+            count * completion_time + length * count * (count + 1) // 2)
+        completion_time += count * length
+    return weighted_sum
+
+
+def longest_job(job_counts):
+    # the longest job, or 1 when there are no jobs
+    return max((length for weight, length in job_counts), default=1)
+
+
+def schedule_columnar(job_counts):
+    # with no jobs, both sums are 0
+    return (
+        schedule_counts(job_counts, diff_key),
+        schedule_counts(job_counts, ratio_key(longest_job(job_counts))),
+    )
+
+
+class RatioNode:
+    """Node of a treap of the distinct weight / length ratios, in
+       decreasing order. Each node keeps the jobs with its ratio and the
+       total length and weight of the jobs in its subtree.
+    """
+    def __init__(self, numerator, denominator):
+        # the ratio in lowest terms, compared exactly by cross-multiplying
+        self.numerator = numerator
+        self.denominator = denominator
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.jobs = Counter()
+        self.length = 0
+        self.weight = 0
+        self.total_length = 0
+        self.total_weight = 0
+
+    def update(self):
+        self.total_length = self.length
+        self.total_weight = self.weight
+        for child in (self.left, self.right):
+            if child is not None:
+                self.total_length += child.total_length
+                self.total_weight += child.total_weight
+
+
+def compare_ratios(numerator1, denominator1, numerator2, denominator2):
+    # negative if the 1st ratio is scheduled first (it is bigger)
+    return numerator2 * denominator1 - numerator1 * denominator2
+
+
+def split(node, numerator, denominator):
+    # split a treap into the ratios bigger than the given one,
+    # and the ratios that are smaller or equal
+    if node is None:
+        return None, None
+    if compare_ratios(node.numerator, node.denominator,
+                      numerator, denominator) < 0:
+        bigger, rest = split(node.right, numerator, denominator)
+        node.right = bigger
+        node.update()
+        return node, rest
+    bigger, rest = split(node.left, numerator, denominator)
+    node.left = rest
+    node.update()
+    return bigger, node
 
+
+def split_equal(node, numerator, denominator):
+    # split off the node with exactly the given ratio, which can only be
+    # the first node of a treap of ratios that are smaller or equal
+    if node is None:
+        return None, None
+    if node.left is not None:
+        equal, node.left = split_equal(node.left, numerator, denominator)
+        node.update()
+        return equal, node
+    if compare_ratios(node.numerator, node.denominator,
+                      numerator, denominator) == 0:
+        rest = node.right
+        node.right = None
+        node.update()
+        return node, rest
+    return None, node
+
+
+def merge(first, second):
+    # merge 2 treaps where every ratio of the 1st comes before the 2nd
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if first.priority > second.priority:
+        first.right = merge(first.right, second)
+        first.update()
+        return first
+    second.left = merge(first, second.left)
+    second.update()
+    return second
+
+
+class OnlineScheduler:
+    """Schedule of jobs in decreasing order of weight / length that is
+       kept up to date as jobs arrive and leave. Adding a job at its place
+       in the order delays every later job by its length, so the sum of
+       weighted completion times changes by
+       weight * (length of the jobs up to and including it) +
+       length * (weight of the jobs after it),
+       and both totals come from the treap in O(log n) expected time.
+    """
+    def __init__(self):
+        self.root = None
+        self.total_weight = 0
+        self.total_length = 0
+        self.weighted_sum = 0
+
+    def objective(self):
+        return self.weighted_sum
+
+    def find(self, numerator, denominator):
+        node = self.root
+        while node is not None:
+            order = compare_ratios(numerator, denominator,
+                                   node.numerator, node.denominator)
+            if order == 0:
+                return node
+            node = node.left if order < 0 else node.right
+        return None
+
+    def prefix(self, numerator, denominator):
+        # the total length and weight of the jobs whose
+        # ratio is bigger than or equal to the given one
+        length = 0
+        weight = 0
+        node = self.root
+        while node is not None:
+            if compare_ratios(node.numerator, node.denominator,
+                              numerator, denominator) <= 0:
+                length += node.length
+                weight += node.weight
+                if node.left is not None:
+                    length += node.left.total_length
+                    weight += node.left.total_weight
+                node = node.right
+            else:
+                node = node.left
+        return length, weight
+
+    def change(self, weight, length, count):
+        # add (count = 1) or remove (count = -1) a job in its ratio's node
+        divisor = gcd(weight, length)
+        numerator, denominator = weight // divisor, length // divisor
+        bigger, rest = split(self.root, numerator, denominator)
+        equal, smaller = split_equal(rest, numerator, denominator)
+        if equal is None:
+            equal = RatioNode(numerator, denominator)
+        equal.jobs[(weight, length)] += count
+        if equal.jobs[(weight, length)] == 0:
+            del equal.jobs[(weight, length)]
+        equal.length += count * length
+        equal.weight += count * weight
+        equal.update()
+        if not equal.jobs:
+            equal = None
+        self.root = merge(merge(bigger, equal), smaller)
+        self.total_weight += count * weight
+        self.total_length += count * length
+
+    def add(self, weight, length):
+        # the new job goes after the jobs with a bigger or equal ratio
+        before_length, before_weight = self.prefix(weight, length)
+        self.weighted_sum += (
+            weight * (before_length + length) +
+            length * (self.total_weight - before_weight)
+        )
+        self.change(weight, length, 1)
+        return self.weighted_sum
+
+    def remove(self, weight, length):
+        # jobs with equal ratios can be reordered freely,
+        # so take the job out from the end of its ratio's block
+        divisor = gcd(weight, length)
+        node = self.find(weight // divisor, length // divisor)
+        if node is None or node.jobs[(weight, length)] == 0:
+            raise ValueError('There is no job with weight {} and length '
+                             '{}'.format(weight, length))
+        before_length, before_weight = self.prefix(weight, length)
+        self.weighted_sum -= (
+            weight * before_length +
+            length * (self.total_weight - before_weight)
+        )
+        self.change(weight, length, -1)
+        return self.weighted_sum
+
+    def order(self):
+        # the (weight, length) of every job, in schedule order
         jobs = []
-        for line in f:
-            weight, length = line.split()
-            jobs.append(Job(int(weight), int(length)))
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                for job, count in sorted(node.jobs.items()):
+                    jobs.extend([job] * count)
+                node = node.right
+        return jobs
+
+
+def list_schedule(job_counts, num_machines, key):
+    # take the jobs in decreasing order of key and start each one on the
+    # machine that becomes free first, found with a heap of
+    # (load, machine); returns the load and the sum of weighted
+    # completion times of every machine
+    loads = [0] * num_machines
+    weighted_sums = [0] * num_machines
+    heap = [(0, machine) for machine in range(num_machines)]
+    for job in sorted(job_counts, key=key, reverse=True):
+        weight, length = job
+        for i in range(job_counts[job]):
+            load, machine = heap[0]
+            load += length
+            loads[machine] = load
+            weighted_sums[machine] += weight * load
+            heapq.heapreplace(heap, (load, machine))
+    return loads, weighted_sums
+
+
+def wspt_machines(job_counts, num_machines):
+    # weighted shortest processing time first, for the
+    # sum of weighted completion times
+    return list_schedule(job_counts, num_machines,
+                         ratio_key(longest_job(job_counts)))
+
+
+def lpt_machines(job_counts, num_machines):
+    # longest processing time first, for the makespan
+    return list_schedule(job_counts, num_machines, lambda job: job[1])
+
+
+def weighted_lower_bound(job_counts, num_machines):
+    # no schedule on P machines beats the single machine optimum / P
+    # plus (P - 1) / 2P times the sum of weight * length (Eastman, Even
+    # and Isaacs), returned as a (numerator, denominator) pair
+    single = schedule_counts(job_counts, ratio_key(longest_job(job_counts)))
+    own = sum(
+        weight * length * count
+        for (weight, length), count in job_counts.items()
+    )
+    return (2 * single + (num_machines - 1) * own, 2 * num_machines)
+
+
+def makespan_lower_bound(job_counts, num_machines):
+    # the work has to be shared out, and the longest job can't be split
+    total_length = sum(
+        length * count for (weight, length), count in job_counts.items())
+    return max(-(-total_length // num_machines),
+               max((length for weight, length in job_counts), default=0))
+
+
+def print_machines(job_counts, num_machines):
+    for name, (loads, weighted_sums) in [
+            ('WSPT', wspt_machines(job_counts, num_machines)),
+            ('LPT', lpt_machines(job_counts, num_machines))]:
+        print('{} on {} machines:'.format(name, num_machines))
+        for machine in range(num_machines):
+            print('  machine {}: load {}, weighted sum {}'.format(
+                machine, loads[machine], weighted_sums[machine]))
+        print('  makespan {}, weighted sum {}'.format(
+            max(loads), sum(weighted_sums)))
+    numerator, denominator = weighted_lower_bound(job_counts, num_machines)
+    print('Lower bounds: makespan {}, weighted sum {}'.format(
+        makespan_lower_bound(job_counts, num_machines),
+        -(-numerator // denominator)))
+
+
+def main(filename='jobs.txt', num_machines=None):
+    # binary job files written by write_jobs are memory-mapped,
+    # text files are read line by line into the same counts
+    if filename.endswith('.bin'):
+        job_counts = map_job_counts(filename)
+    else:
+        job_counts = read_job_counts(filename)
 
-    jobs_diff = sorted(jobs, key=lambda j: (j.diff, j.weight), reverse=True)
-    jobs_ratio = sorted(jobs, key=lambda j: j.ratio, reverse=True)
-    print([j.ratio for j in jobs_ratio[:5]])
+    # with a number of machines, schedule the jobs on parallel machines
+    if num_machines is not None:
+        print_machines(job_counts, int(num_machines))
+        return
 
-    print('Weighted sum for 1st schedule: {}'.format(schedule(jobs_diff)))
-    print('Weighted sum for 2nd schedule: {}'.format(schedule(jobs_ratio)))
+    # the columnar engine orders the jobs by exact integer keys,
+    # so jobs with equal ratios are never misordered by rounding
+    diff_sum, ratio_sum = schedule_columnar(job_counts)
+    print('Weighted sum for 1st schedule: {}'.format(diff_sum))
+    print('Weighted sum for 2nd schedule: {}'.format(ratio_sum))
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
@@ -26,10 +26,24 @@
 # discussion forums.
 
 
+import mmap
+import multiprocessing
+import os
+import sys
+from array import array
 from collections import defaultdict, OrderedDict
 
 
-NUM_VERTICES = 875714
+# the binary cache of a graph starts with this tag, followed by int64s:
+# the size and modification time of the text file it was built from,
+# the number of vertices and the number of edges
+CACHE_TAG = b'SCCCSR01'
+CACHE_HEADER_SIZE = len(CACHE_TAG) + 4 * 8
+# partitions with more vertices than this are sent back to the pool by the
+# forward-backward workers, smaller ones are finished by the same worker
+PARTITION_CUTOFF = 10000
+# the CSR arrays and the scratch arrays of a forward-backward worker
+WORKER_STATE = None
 
 
 def depth_first_search(graph, start, explored=None, finish_order=None):
@@ -61,7 +75,616 @@ def depth_first_search(graph, start, explored=None, finish_order=None):
     return explored, finish_order, visited
 
 
-def main():
+def read_edges(filename, chunk_size=2 ** 22):
+    # the tails and heads of every edge, as 2 flat int32 arrays; the file
+    # is parsed a chunk of lines at a time with a single split and map,
+    # instead of a strip, split and int conversion per line
+    tails = array('i')
+    heads = array('i')
+    with open(filename, 'rb') as f:
+        while True:
+            lines = f.readlines(chunk_size)
+            if not lines:
+                break
+            numbers = array('i', map(int, b''.join(lines).split()))
+            tails.extend(numbers[0::2])
+            heads.extend(numbers[1::2])
+    return tails, heads
+
+
+def build_csr(num_vertices, tails, heads):
+    # compressed sparse rows: the heads of the edges leaving vertex v are
+    # targets[offsets[v]:offsets[v + 1]]; built with a counting sort
+    offsets = array('q', [0]) * (num_vertices + 2)
+    for tail in tails:
+        offsets[tail + 1] += 1
+    for vertex in range(1, num_vertices + 2):
+        offsets[vertex] += offsets[vertex - 1]
+    targets = array('i', [0]) * len(tails)
+    cursors = array('q', offsets)
+    for tail, head in zip(tails, heads):
+        targets[cursors[tail]] = head
+        cursors[tail] += 1
+    return offsets, targets
+
+
+def finishing_order(num_vertices, offsets, targets):
+    # iterative depth-first search over every vertex; each vertex on the
+    # stack keeps a cursor into its edges, so a vertex finishes exactly
+    # when its cursor reaches the end of its edges
+    explored = bytearray(num_vertices + 1)
+    cursors = array('q', offsets)
+    order = array('i')
+    stack = array('i')
+    for start in range(1, num_vertices + 1):
+        if explored[start]:
+            continue
+        explored[start] = 1
+        stack.append(start)
+        while stack:
+            vertex = stack[-1]
+            cursor = cursors[vertex]
+            end = offsets[vertex + 1]
+            while cursor < end and explored[targets[cursor]]:
+                cursor += 1
+            if cursor < end:
+                head = targets[cursor]
+                cursors[vertex] = cursor + 1
+                explored[head] = 1
+                stack.append(head)
+            else:
+                cursors[vertex] = cursor
+                stack.pop()
+                order.append(vertex)
+    return order
+
+
+def label_components(num_vertices, offsets, targets, order):
+    # visit the vertices in the reverse of the finishing order; every
+    # vertex reachable from a new leader that isn't labelled yet belongs
+    # to the leader's component. Components are numbered from 1
+    labels = array('i', [0]) * (num_vertices + 1)
+    num_components = 0
+    stack = array('i')
+    for leader in reversed(order):
+        if labels[leader]:
+            continue
+        num_components += 1
+        labels[leader] = num_components
+        stack.append(leader)
+        while stack:
+            vertex = stack.pop()
+            for edge in range(offsets[vertex], offsets[vertex + 1]):
+                head = targets[edge]
+                if not labels[head]:
+                    labels[head] = num_components
+                    stack.append(head)
+    return labels, num_components
+
+
+def kosaraju(num_vertices, tails, heads):
+    offsets, targets = build_csr(num_vertices, tails, heads)
+    reverse_offsets, reverse_targets = build_csr(num_vertices, heads, tails)
+    return kosaraju_csr(num_vertices, offsets, targets,
+                        reverse_offsets, reverse_targets)
+
+
+def kosaraju_csr(num_vertices, offsets, targets,
+                 reverse_offsets, reverse_targets):
+    # the 1st pass runs on the reversed graph, the 2nd on the graph
+    order = finishing_order(num_vertices, reverse_offsets, reverse_targets)
+    return label_components(num_vertices, offsets, targets, order)
+
+
+def condensation(num_vertices, offsets, targets, labels, num_components):
+    # the DAG of the components, in CSR form over the labels 1 ... n: each
+    # edge between 2 components appears once, however many edges of the
+    # graph join them
+    tails = array('i')
+    heads = array('i')
+    for vertex in range(1, num_vertices + 1):
+        tail = labels[vertex]
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            head = labels[targets[i]]
+            if head != tail:
+                tails.append(tail)
+                heads.append(head)
+    offsets, targets = build_csr(num_components, tails, heads)
+    # drop the repeated edges of each row, marking every head seen
+    # in a row with the row's component
+    dag_offsets = array('q', [0]) * (num_components + 2)
+    dag_targets = array('i')
+    seen = array('i', [0]) * (num_components + 1)
+    for component in range(1, num_components + 1):
+        for i in range(offsets[component], offsets[component + 1]):
+            head = targets[i]
+            if seen[head] != component:
+                seen[head] = component
+                dag_targets.append(head)
+        dag_offsets[component + 1] = len(dag_targets)
+    return dag_offsets, dag_targets
+
+
+def condense(num_vertices, offsets, targets, reverse_offsets,
+             reverse_targets):
+    # the label of every vertex, the number of components and the
+    # condensation DAG in CSR form
+    labels, num_components = kosaraju_csr(
+        num_vertices, offsets, targets, reverse_offsets, reverse_targets)
+    dag_offsets, dag_targets = condensation(
+        num_vertices, offsets, targets, labels, num_components)
+    return labels, num_components, dag_offsets, dag_targets
+
+
+def topological_order(num_components, dag_offsets, dag_targets):
+    # Kahn's algorithm: repeatedly take a component with no edges left
+    # coming into it
+    in_degrees = array('i', [0]) * (num_components + 1)
+    for head in dag_targets:
+        in_degrees[head] += 1
+    order = array('i', [
+        c for c in range(1, num_components + 1) if not in_degrees[c]
+    ])
+    # the order grows while it is being consumed
+    for component in order:
+        for i in range(dag_offsets[component], dag_offsets[component + 1]):
+            head = dag_targets[i]
+            in_degrees[head] -= 1
+            if not in_degrees[head]:
+                order.append(head)
+    return order
+
+
+def find(forest, node):
+    # the leader node points to itself; on the way up,
+    # point every other node at its grandparent
+    while node != forest[node]:
+        forest[node] = forest[forest[node]]
+        node = forest[node]
+    return node
+
+
+class IncrementalSCC:
+    """Strongly connected components that are kept up to date as edges are
+       added. The components start as the labels of a full decomposition,
+       which are merged in a union-find forest when a new edge closes a
+       cycle between them, and every component has a position in a
+       topological order of the condensation DAG. A new edge that goes
+       backwards in the order is handled by searching only the components
+       between its 2 positions, forwards from its head and backwards from
+       its tail: those found by both searches merge with the edge's
+       components, and the others are reordered among their own positions
+       (Pearce and Kelly), instead of running both passes of Kosaraju again.
+    """
+    def __init__(self, labels, num_components, dag_offsets, dag_targets):
+        self.labels = labels
+        self.num_components = num_components
+        dag_tails = array('i')
+        for component in range(1, num_components + 1):
+            dag_tails.extend(array('i', [component]) * (
+                dag_offsets[component + 1] - dag_offsets[component]))
+        reverse_offsets, reverse_targets = build_csr(
+            num_components, dag_targets, dag_tails)
+        self.dag = (dag_offsets, dag_targets)
+        self.reverse_dag = (reverse_offsets, reverse_targets)
+        # the leaders of the forest are the current components; the
+        # original components merged into a leader, if it has merged
+        self.forest = list(range(num_components + 1))
+        self.members = {}
+        # the edges added since the decomposition, keyed by their leaders
+        self.added = defaultdict(list)
+        self.added_reverse = defaultdict(list)
+        self.position = array('i', [0]) * (num_components + 1)
+        order = topological_order(num_components, dag_offsets, dag_targets)
+        for position, component in enumerate(order):
+            self.position[component] = position
+
+    @classmethod
+    def from_csr(cls, num_vertices, offsets, targets, reverse_offsets,
+                 reverse_targets):
+        return cls(*condense(num_vertices, offsets, targets,
+                             reverse_offsets, reverse_targets))
+
+    def component(self, vertex):
+        return find(self.forest, self.labels[vertex])
+
+    def neighbours(self, component, dag, added):
+        # the current components joined to a component by an edge,
+        # including itself and repeats
+        offsets, targets = dag
+        for original in self.members.get(component, (component,)):
+            for i in range(offsets[original], offsets[original + 1]):
+                yield find(self.forest, targets[i])
+        for other in added.get(component, ()):
+            yield find(self.forest, other)
+
+    def search(self, start, dag, added, inside):
+        # the components reachable from start among those whose
+        # position passes the inside test
+        found = set([start])
+        stack = [start]
+        while stack:
+            component = stack.pop()
+            for other in self.neighbours(component, dag, added):
+                if other not in found and inside(self.position[other]):
+                    found.add(other)
+                    stack.append(other)
+        return found
+
+    def insert(self, tail, head):
+        # add the edge tail -> head and return whether components merged
+        source = self.component(tail)
+        target = self.component(head)
+        if source == target:
+            return False
+        self.added[source].append(target)
+        self.added_reverse[target].append(source)
+        lower = self.position[target]
+        upper = self.position[source]
+        if upper < lower:
+            # the edge agrees with the order
+            return False
+        forward = self.search(target, self.dag, self.added,
+                              lambda position: position <= upper)
+        backward = self.search(source, self.reverse_dag, self.added_reverse,
+                               lambda position: position >= lower)
+        merged = forward & backward
+        # the components that reach the new edge take the lowest of the
+        # positions that they all held, and those reached from it the
+        # highest; a merged component takes one of the positions between
+        positions = sorted(self.position[c] for c in forward | backward)
+        by_position = self.position.__getitem__
+        before = sorted(backward - merged, key=by_position)
+        after = sorted(forward - merged, key=by_position)
+        for position, component in zip(positions, before):
+            self.position[component] = position
+        for position, component in zip(positions[-len(after):], after):
+            self.position[component] = position
+        if merged:
+            self.position[self.merge(merged)] = positions[len(before)]
+        return bool(merged)
+
+    def merge(self, components):
+        # point every component at the one with the most original
+        # components, and collect their original components and edges
+        leader = max(components,
+                     key=lambda c: len(self.members.get(c, (c,))))
+        members = self.members.setdefault(leader, [leader])
+        for component in components:
+            if component == leader:
+                continue
+            self.forest[component] = leader
+            members.extend(self.members.pop(component, [component]))
+            self.added[leader].extend(self.added.pop(component, []))
+            self.added_reverse[leader].extend(
+                self.added_reverse.pop(component, []))
+        self.num_components -= len(components) - 1
+        return leader
+
+    def condensation(self):
+        # the current labels, numbered from 1 in topological order, their
+        # number and the condensation DAG in CSR form
+        leaders = sorted(
+            (c for c in range(1, len(self.forest)) if self.forest[c] == c),
+            key=lambda c: self.position[c])
+        numbers = array('i', [0]) * len(self.forest)
+        for number, leader in enumerate(leaders, 1):
+            numbers[leader] = number
+        labels = array('i', [0]) * len(self.labels)
+        for vertex in range(1, len(self.labels)):
+            labels[vertex] = numbers[self.component(vertex)]
+        dag_offsets = array('q', [0]) * (len(leaders) + 2)
+        dag_targets = array('i')
+        for number, leader in enumerate(leaders, 1):
+            heads = set(self.neighbours(leader, self.dag, self.added))
+            heads.discard(leader)
+            dag_targets.extend(sorted(numbers[head] for head in heads))
+            dag_offsets[number + 1] = len(dag_targets)
+        return labels, len(leaders), dag_offsets, dag_targets
+
+
+def cache_layout(num_vertices, num_edges):
+    # the typecode, start and length in bytes of every array in the cache,
+    # and the size of the whole cache. Each array is padded to a multiple
+    # of 8 bytes so that every array in the memory map starts aligned
+    layout = []
+    start = CACHE_HEADER_SIZE
+    for typecode, length in [('q', num_vertices + 2), ('i', num_edges),
+                             ('q', num_vertices + 2), ('i', num_edges)]:
+        nbytes = length * array(typecode).itemsize
+        layout.append((typecode, start, nbytes))
+        start += nbytes + (-nbytes % 8)
+    return layout, start
+
+
+def write_cache(cache_filename, source_stat, num_vertices, csr_arrays):
+    # the header, then every padded array. The cache is written to a
+    # temporary file that replaces the cache once it is complete, so an
+    # interrupted run never leaves a partial cache behind
+    temporary_filename = cache_filename + '.tmp'
+    try:
+        with open(temporary_filename, 'wb') as f:
+            f.write(CACHE_TAG)
+            array('q', [source_stat.st_size, source_stat.st_mtime_ns,
+                        num_vertices, len(csr_arrays[1])]).tofile(f)
+            for values in csr_arrays:
+                values.tofile(f)
+                f.write(b'\0' * (-len(values) * values.itemsize % 8))
+        os.replace(temporary_filename, cache_filename)
+    except OSError:
+        # don't leave a partial temporary file behind
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+        raise
+
+
+def read_cache(cache_filename, source_stat):
+    # memory-map the cache and view its arrays in place, without copying
+    # them; returns None if the cache is missing, out of date or truncated
+    try:
+        f = open(cache_filename, 'rb')
+    except IOError:
+        return None
+    with f:
+        header = f.read(CACHE_HEADER_SIZE)
+        if len(header) < CACHE_HEADER_SIZE or not header.startswith(CACHE_TAG):
+            return None
+        size, mtime, num_vertices, num_edges = array(
+            'q', header[len(CACHE_TAG):])
+        if (size, mtime) != (source_stat.st_size, source_stat.st_mtime_ns):
+            return None
+        layout, cache_size = cache_layout(num_vertices, num_edges)
+        if os.fstat(f.fileno()).st_size != cache_size:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    csr_arrays = [
+        view[start:start + nbytes].cast(typecode)
+        for typecode, start, nbytes in layout
+    ]
+    return num_vertices, csr_arrays
+
+
+def load_graph(filename):
+    # the number of vertices and the forward and reverse CSR arrays of an
+    # edge list file; the 1st run parses the text and saves a binary cache
+    # next to it, which later runs memory-map instead
+    cache_filename = filename + '.csr'
+    source_stat = os.stat(filename)
+    cached = read_cache(cache_filename, source_stat)
+    if cached is not None:
+        return cached
+    tails, heads = read_edges(filename)
+    # the vertices are labelled from 1, so the largest label is their number
+    num_vertices = max(max(tails), max(heads)) if tails else 0
+    offsets, targets = build_csr(num_vertices, tails, heads)
+    reverse_offsets, reverse_targets = build_csr(num_vertices, heads, tails)
+    csr_arrays = [offsets, targets, reverse_offsets, reverse_targets]
+    try:
+        write_cache(cache_filename, source_stat, num_vertices, csr_arrays)
+    except OSError:
+        # the cache only saves time, so carry on without it, for example
+        # when the input's directory is read-only
+        pass
+    return num_vertices, csr_arrays
+
+
+def scc_sizes(labels, num_components):
+    sizes = array('i', [0]) * (num_components + 1)
+    for label in labels:
+        sizes[label] += 1
+    # vertex 0 doesn't exist, so don't count its label
+    sizes[0] = 0
+    return sorted(sizes, reverse=True)
+
+
+def canonical_labels(labels):
+    # renumber the components from 1 in the order of their smallest vertex,
+    # so that engines that find the components in different orders give
+    # the same labels
+    numbers = {}
+    canonical = array('i', [0]) * len(labels)
+    for vertex in range(1, len(labels)):
+        label = labels[vertex]
+        if label not in numbers:
+            numbers[label] = len(numbers) + 1
+        canonical[vertex] = numbers[label]
+    return canonical, len(numbers)
+
+
+def init_worker(num_vertices, offsets, targets,
+                reverse_offsets, reverse_targets):
+    # every vertex of a partition is coloured with the partition's id, so a
+    # search stays inside its partition by only following edges to vertices
+    # of that colour. Ids only grow, so the colours never need clearing
+    global WORKER_STATE
+    WORKER_STATE = {
+        'csr': (offsets, targets, reverse_offsets, reverse_targets),
+        'colors': array('i', [0]) * (num_vertices + 1),
+        'out_degrees': array('i', [0]) * (num_vertices + 1),
+        'in_degrees': array('i', [0]) * (num_vertices + 1),
+        'next_id': 1,
+    }
+
+
+def new_color():
+    color = WORKER_STATE['next_id']
+    WORKER_STATE['next_id'] += 1
+    return color
+
+
+def trim(vertices, color):
+    # repeatedly remove the vertices of the partition with no edges into it
+    # or no edges out of it, each of them is an SCC on its own. Returns the
+    # trimmed vertices
+    offsets, targets, reverse_offsets, reverse_targets = WORKER_STATE['csr']
+    colors = WORKER_STATE['colors']
+    out_degrees = WORKER_STATE['out_degrees']
+    in_degrees = WORKER_STATE['in_degrees']
+    queue = array('i')
+    for vertex in vertices:
+        out_degree = 0
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            if colors[targets[i]] == color:
+                out_degree += 1
+        in_degree = 0
+        for i in range(reverse_offsets[vertex], reverse_offsets[vertex + 1]):
+            if colors[reverse_targets[i]] == color:
+                in_degree += 1
+        out_degrees[vertex] = out_degree
+        in_degrees[vertex] = in_degree
+        if out_degree == 0 or in_degree == 0:
+            queue.append(vertex)
+    # only take the trimmed vertices out once every degree is counted
+    for vertex in queue:
+        colors[vertex] = 0
+    # the queue grows while it is being consumed
+    for vertex in queue:
+        for i in range(offsets[vertex], offsets[vertex + 1]):
+            head = targets[i]
+            if colors[head] == color:
+                in_degrees[head] -= 1
+                if in_degrees[head] == 0:
+                    queue.append(head)
+                    colors[head] = 0
+        for i in range(reverse_offsets[vertex], reverse_offsets[vertex + 1]):
+            tail = reverse_targets[i]
+            if colors[tail] == color:
+                out_degrees[tail] -= 1
+                if out_degrees[tail] == 0:
+                    queue.append(tail)
+                    colors[tail] = 0
+    return queue
+
+
+def reach(offsets, targets, pivot, colors, recolor):
+    # level-synchronous breadth-first search from the pivot, giving every
+    # reachable vertex whose colour is a key of recolor its new colour
+    colors[pivot] = recolor[colors[pivot]]
+    frontier = array('i', [pivot])
+    while frontier:
+        next_frontier = array('i')
+        for vertex in frontier:
+            for i in range(offsets[vertex], offsets[vertex + 1]):
+                head = targets[i]
+                new = recolor.get(colors[head])
+                if new is not None:
+                    colors[head] = new
+                    next_frontier.append(head)
+        frontier = next_frontier
+
+
+def split_partition(vertices):
+    # one forward-backward step: trim the partition, then the vertices both
+    # reachable from a pivot and reaching it form the pivot's SCC. The rest
+    # splits into the vertices only reachable from the pivot, those only
+    # reaching it and those that are neither, and no SCC crosses these 3
+    # partitions. Returns the SCCs found and the 3 partitions
+    offsets, targets, reverse_offsets, reverse_targets = WORKER_STATE['csr']
+    colors = WORKER_STATE['colors']
+    color = new_color()
+    for vertex in vertices:
+        colors[vertex] = color
+    components = [array('i', [vertex]) for vertex in trim(vertices, color)]
+    vertices = array('i', [v for v in vertices if colors[v] == color])
+    if not vertices:
+        return components, []
+    # a vertex with many edges both ways is likely in a large SCC
+    out_degrees = WORKER_STATE['out_degrees']
+    in_degrees = WORKER_STATE['in_degrees']
+    pivot = max(vertices, key=lambda v: out_degrees[v] * in_degrees[v])
+    forward = new_color()
+    backward = new_color()
+    both = new_color()
+    reach(offsets, targets, pivot, colors, {color: forward})
+    reach(reverse_offsets, reverse_targets, pivot, colors,
+          {color: backward, forward: both})
+    partitions = {color: array('i'), forward: array('i'),
+                  backward: array('i'), both: array('i')}
+    for vertex in vertices:
+        partitions[colors[vertex]].append(vertex)
+    components.append(partitions.pop(both))
+    return components, [p for p in partitions.values() if p]
+
+
+def decompose(task):
+    # split the partition, and keep splitting the resulting partitions that
+    # are at most `cutoff` vertices; returns the SCCs found and the larger
+    # partitions, for the other workers. Without a cutoff, every partition
+    # is split here
+    vertices, cutoff = task
+    components = []
+    large = []
+    stack = [vertices]
+    while stack:
+        found, partitions = split_partition(stack.pop())
+        components.extend(found)
+        for partition in partitions:
+            if cutoff is not None and len(partition) > cutoff:
+                large.append(partition)
+            else:
+                stack.append(partition)
+    return components, large
+
+
+def forward_backward(num_vertices, offsets, targets, reverse_offsets,
+                     reverse_targets, processes=None,
+                     cutoff=PARTITION_CUTOFF):
+    # forward-backward SCC decomposition with trimming. The partitions are
+    # independent, so every round the pool splits all of the partitions
+    # at once. Returns the same labels as canonical_labels gives for the
+    # labels of kosaraju, and their number
+    csr_arrays = [offsets, targets, reverse_offsets, reverse_targets]
+    pool = None
+    if processes is None:
+        init_worker(num_vertices, *csr_arrays)
+        cutoff = None
+    else:
+        # memory views of the cache can't be sent to the workers
+        csr_arrays = [
+            a if isinstance(a, array) else array(a.format, a.tobytes())
+            for a in csr_arrays
+        ]
+        pool = multiprocessing.Pool(processes, initializer=init_worker,
+                                    initargs=[num_vertices] + csr_arrays)
+    components = []
+    tasks = [(array('i', range(1, num_vertices + 1)), cutoff)]
+    try:
+        while tasks:
+            if pool is None:
+                results = map(decompose, tasks)
+            else:
+                results = pool.map(decompose, tasks, chunksize=1)
+            tasks = []
+            for found, large in results:
+                components.extend(found)
+                tasks.extend((partition, cutoff) for partition in large)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    labels = array('i', [0]) * (num_vertices + 1)
+    for label, component in enumerate(components, 1):
+        for vertex in component:
+            labels[vertex] = label
+    return canonical_labels(labels)
+
+
+def main(engine='csr', processes=None):
+    if engine in ('csr', 'fwbw'):
+        num_vertices, csr_arrays = load_graph('SCC.txt')
+        if engine == 'csr':
+            labels, num_components = kosaraju_csr(num_vertices, *csr_arrays)
+        else:
+            labels, num_components = forward_backward(
+                num_vertices, *csr_arrays,
+                processes=processes and int(processes))
+        print('The sizes of the top 5 SCCs are {}.'.format(
+            scc_sizes(labels, num_components)[:5]))
+        return
+    elif engine != 'sets':
+        raise ValueError('Unknown engine {}'.format(engine))
+
     with open('SCC.txt', 'r') as f:
         # represent the graph as a dictionary,
         # with the vertex as the key and its neighbors
@@ -76,13 +699,16 @@ def main():
             graph[tail].add(head)
             graph_reversed[head].add(tail)
 
+        # the vertices are labelled from 1, so the largest is their number
+        num_vertices = max(max(graph), max(graph_reversed))
+
         print('Constructed graphs')
 
         seen = set()
         order = OrderedDict()
         # iterate through all the vertices
         # to ensure that all the vertices are explored
-        for vertex in range(1, NUM_VERTICES + 1):
+        for vertex in range(1, num_vertices + 1):
             if vertex not in seen:
                 (
                     seen,
@@ -124,4 +750,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
@@ -19,9 +19,16 @@
 # the chaining and open addressing approaches to resolving collisions.
 
 
+import sys
+from array import array
 from bisect import bisect_left, bisect_right
 
 
+# the interval of target values t
+LOWER = -10000
+UPPER = 10000
+
+
 def merge_sort(integers):
     # base case, no sorting needed
     if len(integers) == 1:
@@ -74,28 +81,93 @@ def binary_search(integers, n):
         return binary_search(right_half, n)
 
 
-def main():
+def count_targets_bisect(integers, lower=LOWER, upper=UPPER):
+    # Not using the merge sort algorithm implemented above
+    # because of stack overflow and speed issues. Also,
+    # the algorithm used to count inversions in assignment 1
+    # piggybacks on merge sort. See count_inversions.py
+    integers = sorted(integers)
+    sets = set()
+
+    for x in integers:
+        # Not using the binary search algorithm implemented above
+        # because of stack overflow and speed issues.
+        left = bisect_left(integers, lower - x)
+        right = bisect_right(integers, upper - x)
+        integers_to_search = integers[left:right]
+        sets.update(set([x + y for y in integers_to_search if y != x]))
+
+    return len(sets)
+
+
+def count_targets(integers, lower=LOWER, upper=UPPER):
+    # sweep the sorted distinct values with x going up, while the window
+    # of the values y > x with lower <= x + y <= upper slides down, so each
+    # end of the window only ever moves left. Every sum found in a window
+    # is marked in a bitmap of the interval
+    values = array('q', sorted(set(integers)))
+    found = bytearray(upper - lower + 1)
+    # the window is values[low:high + 1]
+    low = len(values)
+    high = len(values) - 1
+    for i, x in enumerate(values):
+        while high > i and values[high] > upper - x:
+            high -= 1
+        if high <= i:
+            break
+        while low > 0 and values[low - 1] >= lower - x:
+            low -= 1
+        for j in range(max(low, i + 1), high + 1):
+            found[x + values[j] - lower] = 1
+    return found.count(1)
+
+
+def count_targets_hashed(integers, lower=LOWER, upper=UPPER):
+    # put every value x in the bucket x // width, where width is the number
+    # of targets, so the values y with lower <= x + y <= upper are all in
+    # the bucket (lower - x) // width or the next one. Each value is
+    # checked against the values before it, so the integers can be
+    # streamed without sorting them, in expected linear time
+    width = upper - lower + 1
+    buckets = {}
+    get = buckets.get
+    # repeated values don't make new sums, so skip the values already seen
+    seen = set()
+    found = bytearray(width)
+    for x in integers:
+        if x in seen:
+            continue
+        seen.add(x)
+        first = (lower - x) // width
+        for y in get(first, ()):
+            if lower <= x + y <= upper:
+                found[x + y - lower] = 1
+        for y in get(first + 1, ()):
+            if lower <= x + y <= upper:
+                found[x + y - lower] = 1
+        key = x // width
+        bucket = get(key)
+        if bucket is None:
+            buckets[key] = [x]
+        else:
+            bucket.append(x)
+    return found.count(1)
+
+
+ENGINES = {
+    'bisect': count_targets_bisect,
+    'hashed': count_targets_hashed,
+    'sweep': count_targets,
+}
+
+
+def main(engine='sweep'):
     with open('algo1-programming_prob-2sum.txt', 'r') as f:
         integers = [int(line) for line in f]
-        # Not using the merge sort algorithm implemented above
-        # because of stack overflow and speed issues. Also,
-        # the algorithm used to count inversions in assignment 1
-        # piggybacks on merge sort. See count_inversions.py
-        integers = sorted(integers)
-        sets = set()
-
-        for x in integers:
-            # Not using the binary search algorithm implemented above
-            # because of stack overflow and speed issues.
-            left = bisect_left(integers, -10000 - x)
-            right = bisect_right(integers, 10000 - x)
-            integers_to_search = integers[left:right]
-            sets.update(set([x + y for y in integers_to_search]))
-
         print('There are {} t for which distinct x + y = t.'.format(
-            len(sets))
+            ENGINES[engine](integers))
         )
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:])
@@ -0,0 +1,62 @@
+# Compare the two-sum engines in two_sum.py: the sort-based two-pointer sweep
+# and the hash-bucketed engine that doesn't sort, in terms of running time.
+#
+# The inputs are algo1-programming_prob-2sum.txt, if it is in the current
+# directory, and generated integers drawn uniformly from the same range as
+# the integers of that file. Run it with the generated input sizes as
+# arguments, for example "python two_sum_benchmark.py 1000000 100000000" for
+# inputs of 10^6 and 10^8 values. An input of 10^8 values needs several
+# gigabytes of memory, since every engine keeps the distinct values.
+
+
+import os
+import random
+import sys
+import time
+
+from two_sum import count_targets, count_targets_hashed
+
+
+FILENAME = 'algo1-programming_prob-2sum.txt'
+SIZES = [10 ** 6, 10 ** 7]
+# the integers of the 2SUM input are in [-RANGE, RANGE]
+RANGE = 10 ** 11
+ENGINES = [
+    ('sort + sweep', count_targets),
+    ('hashed', count_targets_hashed),
+]
+
+
+def random_integers(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(-RANGE, RANGE) for i in range(n)]
+
+
+def benchmark(name, integers):
+    print('{} ({} values)'.format(name, len(integers)))
+    counts = set()
+    for engine, function in ENGINES:
+        start = time.time()
+        count = function(integers)
+        print('  {:<14} count={:<6} time={:8.2f}s'.format(
+            engine, count, time.time() - start))
+        counts.add(count)
+    if len(counts) > 1:
+        print('  MISMATCH')
+
+
+def main(sizes=SIZES):
+    if os.path.exists(FILENAME):
+        with open(FILENAME, 'r') as f:
+            benchmark(FILENAME, [int(line) for line in f])
+    else:
+        print('{} not found, skipped'.format(FILENAME))
+    for size in sizes:
+        benchmark('random integers', random_integers(size, seed=size))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main()